@@ -0,0 +1,68 @@
+import pandas as pd
+
+# Rollup name -> candidate source columns, first one present wins
+DIMENSIONS = {
+    'type': ['type'],
+    'agency': ['fullParentPathName'],
+    'naics': ['naicsCode'],
+    'set_aside': ['typeOfSetAsideDescription', 'typeOfSetAside', 'setAside'],
+    'week': ['postedDate'],
+}
+
+
+def _dimension(df, name):
+    for column in DIMENSIONS[name]:
+        if column in df.columns:
+            values = df[column]
+            if name == 'week':
+                if not pd.api.types.is_datetime64_any_dtype(values):
+                    return None
+                return values.dt.to_period('W').dt.start_time
+            return values.astype('category') if values.dtype == object else values
+    return None
+
+
+def compute_rollups(df):
+    # One groupby over every dimension at once builds a small cube; each
+    # rollup and KPI is then a cheap reduction of the cube, not of the rows
+    keys = {}
+    for name in DIMENSIONS:
+        values = _dimension(df, name)
+        if values is not None:
+            keys[name] = values
+
+    days = df['days_remaining'] if 'days_remaining' in df.columns else pd.Series(float('nan'), index=df.index)
+    measures = pd.DataFrame({
+        'count': 1,
+        'active': (days > 0).astype('int64'),
+        'days_sum': days.fillna(0),
+        'days_count': days.notna().astype('int64'),
+    }, index=df.index)
+
+    if keys:
+        cube = (measures.groupby([keys[name] for name in keys], observed=True, dropna=False, sort=False)
+                        .sum()
+                        .reset_index())
+        cube.columns = list(keys) + list(measures.columns)
+    else:
+        cube = measures.sum().to_frame().T
+
+    days_count = cube['days_count'].sum()
+    kpis = {
+        'total': int(cube['count'].sum()),
+        'active': int(cube['active'].sum()),
+        'avg_days_remaining': cube['days_sum'].sum() / days_count if days_count else 0.0,
+        'unique_agencies': int(cube['agency'].nunique()) if 'agency' in cube.columns else 0,
+    }
+
+    rollups = {'kpis': kpis}
+    for name in keys:
+        table = (cube.groupby(name, dropna=False, observed=True)[['count', 'active']]
+                     .sum()
+                     .reset_index())
+        if name == 'week':
+            rollups[name] = table.dropna(subset=[name]).sort_values(name, ignore_index=True)
+        else:
+            table[name] = table[name].astype(object).where(table[name].notna(), 'N/A')
+            rollups[name] = table.sort_values('count', ascending=False, ignore_index=True)
+    return rollups
@@ -1,63 +1,92 @@
+import time
+from datetime import datetime
+
 import streamlit as st
-import pickle
-import os.path
-from datetime import datetime, timedelta
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from user_store import get_user_store
+from sessions import get_session_store
+from passwords import hash_password, verify_password, needs_rehash, verification_cache
+from profiling import timed
+
+DUMMY_HASH = hash_password('not-a-real-password')
+
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
 
 class Authenticator:
-    def __init__(self):
-        self.users_db_file = 'users.pkl'
-        self.users = self.load_users()
-
-    def load_users(self):
-        if os.path.exists(self.users_db_file):
-            with open(self.users_db_file, 'rb') as f:
-                return pickle.load(f)
-        return {
-            'admin': {
-                'password': 'admin123',  # Change this default password
-                'email': 'admin@example.com',
-                'created_at': datetime.now()
-            }
-        }
-
-    def save_users(self):
-        with open(self.users_db_file, 'wb') as f:
-            pickle.dump(self.users, f)
-
-    def login(self, username, password):
-        if username in self.users and self.users[username]['password'] == password:
+    def __init__(self, store=None):
+        self.store = store or get_user_store()
+
+    def login(self, username, password, session_id=None):
+        user = self.store.get(username)
+        if user is None:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            verify_password(password, DUMMY_HASH)
+            return False
+
+        stored = user['password']
+        if session_id is not None and verification_cache.check(session_id, username, password, stored):
             return True
-        return False
+        if not verify_password(password, stored):
+            return False
+
+        if needs_rehash(stored):
+            stored = hash_password(password)
+            self.store.set_password(username, stored)
+        if session_id is not None:
+            verification_cache.add(session_id, username, password, stored)
+        return True
 
     def register(self, username, password, email):
-        if username in self.users:
+        if not self.store.insert(username, hash_password(password), email):
             return False, "Username already exists"
-        
-        self.users[username] = {
-            'password': password,
-            'email': email,
-            'created_at': datetime.now()
-        }
-        self.save_users()
         return True, "Registration successful"
 
     def reset_password(self, username, email):
-        if username in self.users and self.users[username]['email'] == email:
-            # Here you would typically send an email with reset link
-            # For demo, we'll just reset to a default password
-            self.users[username]['password'] = 'resetpass123'
-            self.save_users()
+        # Here you would typically send an email with reset link
+        # For demo, we'll just reset to a default password
+        if self.store.set_password(username, hash_password('resetpass123'), email=email):
+            # Whoever is logged in as this user is logged out
+            get_session_store().revoke_user(username)
             return True, "Password has been reset to: resetpass123"
         return False, "Invalid username or email"
 
+def restore_session():
+    # Fast path for every authenticated rerun: validate the signed token in
+    # memory and return before touching the user store. The token only ever
+    # lives in session state, never in the URL, so it ends with the websocket
+    token = st.session_state.get('auth_token')
+    if not token:
+        return False
+
+    session = get_session_store().validate(token)
+    if session is None:
+        st.session_state.auth_token = None
+        return False
+
+    st.session_state.auth_token = token
+    st.session_state.authenticated = True
+    st.session_state.username = session['username']
+    return True
+
+def start_session(username):
+    st.session_state.auth_token = get_session_store().create(username)
+    st.session_state.authenticated = True
+    st.session_state.username = username
+
+@timed("login_page")
 def login_page():
+    start = time.perf_counter()
+    if restore_session():
+        get_session_store().record_latency(time.perf_counter() - start, 'token')
+        return True
+
+    st.session_state.authenticated = False
     st.title("Login")
     
     # Initialize the authenticator
     auth = Authenticator()
-    
-    if 'authenticated' not in st.session_state:
-        st.session_state.authenticated = False
 
     if not st.session_state.authenticated:
         tab1, tab2, tab3 = st.tabs(["Login", "Register", "Reset Password"])
@@ -67,9 +96,8 @@ def login_page():
             password = st.text_input("Password", type="password", key="login_password")
             
             if st.button("Login"):
-                if auth.login(username, password):
-                    st.session_state.authenticated = True
-                    st.session_state.username = username
+                if auth.login(username, password, session_id=current_session_id()):
+                    start_session(username)
                     st.success("Login successful!")
                     st.rerun()
                 else:
@@ -98,8 +126,29 @@ def login_page():
                 else:
                     st.error(message)
 
+    get_session_store().record_latency(time.perf_counter() - start, 'login form')
     return st.session_state.authenticated
 
 def logout():
+    get_session_store().revoke_token(st.session_state.get('auth_token'))
+    st.session_state.auth_token = None
     st.session_state.authenticated = False
     st.session_state.username = None
+
+def session_admin_panel():
+    sessions = get_session_store()
+    with st.sidebar.expander("🔐 Active Sessions"):
+        active = sessions.active()
+        st.caption(f"{len(active)} active sessions")
+        for session in sorted(active, key=lambda s: s['last_seen'], reverse=True):
+            col1, col2 = st.columns([3, 1])
+            col1.write(f"**{session['username']}** · last seen "
+                       f"{datetime.fromtimestamp(session['last_seen']):%H:%M:%S}, expires "
+                       f"{datetime.fromtimestamp(session['expires_at']):%m/%d %H:%M}")
+            if col2.button("Revoke", key=f"revoke_{session['session_id']}"):
+                sessions.revoke(session['session_id'])
+                st.rerun()
+
+        st.write("Auth path latency per rerun")
+        for path, (samples, p50, p95) in sessions.latency_stats().items():
+            st.caption(f"{path}: p50 {p50:.2f} ms · p95 {p95:.2f} ms ({samples} reruns)")
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from ingest import ingest, sheet_names, compact_dtypes
+from transforms import PROVENANCE_COLUMNS
+
+# Record keys used to drop duplicates across files; later files win, so the
+# newest monthly forecast should be uploaded last
+KEY_COLUMNS = ['APFS Number', 'noticeId']
+MIN_SHARED_COLUMNS = 0.5  # sheets sharing less of the main layout (cover sheets, notes) are skipped
+
+
+def list_parts(path, name, kind):
+    # One part per sheet of a workbook, one for a CSV
+    if kind == 'excel':
+        return [(path, name, kind, sheet) for sheet in sheet_names(path)]
+    return [(path, name, kind, None)]
+
+
+def parse_part(path, name, kind, sheet):
+    # Runs in a worker process; reads the file from disk rather than having
+    # the whole workbook pickled over for every sheet
+    with open(path, 'rb') as f:
+        df, stats = ingest(f, kind, sheet=sheet)
+    return df, stats
+
+
+def merge_parts(parts):
+    # parts: [(file name, sheet or None, df)] in upload order.
+    # Returns (df, duplicates dropped, [(file, sheet) skipped])
+    parts = [part for part in parts if not part[2].empty]
+    if not parts:
+        return pd.DataFrame(columns=PROVENANCE_COLUMNS), 0, []
+
+    # The layout holding the most rows is taken as the dataset's
+    layout = max(parts, key=lambda part: len(part[2]))[2].columns
+    frames, skipped = [], []
+    for name, sheet, df in parts:
+        if len(df.columns.intersection(layout)) < MIN_SHARED_COLUMNS * len(layout):
+            skipped.append((name, sheet))
+            continue
+        frames.append(df.assign(source_file=name, source_sheet=sheet or ''))
+
+    # Sheets can disagree on dtypes (and categories), so let concat widen them,
+    # unify mixed columns as text and re-compact once
+    merged = pd.concat(frames, ignore_index=True, sort=False)
+    for column in merged.columns:
+        series = merged[column]
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True).startswith('mixed'):
+            # e.g. NAICS parsed as numbers from a CSV but as text from a workbook
+            merged[column] = series.astype(str).where(series.notna(), None)
+    rows = len(merged)
+    key = next((c for c in KEY_COLUMNS if c in merged.columns), None)
+    if key is not None:
+        has_key = merged[key].notna()
+        merged = pd.concat([
+            merged[has_key].drop_duplicates(subset=key, keep='last'),
+            merged[~has_key],
+        ]).sort_index()
+    else:
+        content = [c for c in merged.columns if c not in PROVENANCE_COLUMNS]
+        merged = merged.drop_duplicates(subset=content, keep='last')
+    merged = compact_dtypes(merged.reset_index(drop=True))
+    for column in PROVENANCE_COLUMNS:
+        merged[column] = merged[column].astype('category')
+    return merged, rows - len(merged), skipped
+
+
+def ingest_batch(files, on_progress=None, max_workers=None):
+    # files: [(name, kind, file object)]. Every sheet of every file is parsed
+    # in its own process; on_progress(name, sheets_done, sheets_total, rows)
+    # fires as each sheet finishes. Returns (df, stats)
+    start = time.perf_counter()
+    workdir = tempfile.mkdtemp(prefix='capture-batch-')
+    try:
+        parts = []
+        for i, (name, kind, file) in enumerate(files):
+            path = os.path.join(workdir, f"{i}-{os.path.basename(name)}")
+            file.seek(0)
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(file, f)
+            file.seek(0)
+            parts.extend(list_parts(path, name, kind))
+
+        sheets_total = {}
+        for _, name, _, _ in parts:
+            sheets_total[name] = sheets_total.get(name, 0) + 1
+        sheets_done = dict.fromkeys(sheets_total, 0)
+        rows_done = dict.fromkeys(sheets_total, 0)
+        results = {}
+
+        def finished(index, df):
+            name = parts[index][1]
+            results[index] = df
+            sheets_done[name] += 1
+            rows_done[name] += len(df)
+            if on_progress is not None:
+                on_progress(name, sheets_done[name], sheets_total[name], rows_done[name])
+
+        workers = min(max_workers or os.cpu_count() or 1, len(parts))
+        if workers <= 1:
+            for index, part in enumerate(parts):
+                finished(index, parse_part(*part)[0])
+        else:
+            # spawn, not fork: the Streamlit server process is multithreaded
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = {executor.submit(parse_part, *part): index for index, part in enumerate(parts)}
+                for future in as_completed(futures):
+                    finished(futures[future], future.result()[0])
+
+        df, duplicates, skipped = merge_parts([(parts[i][1], parts[i][3], results[i]) for i in range(len(parts))])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'files': len(files),
+        'sheets': len(parts),
+        'workers': workers,
+        'rows': len(df),
+        'columns': len(df.columns),
+        'duplicates': duplicates,
+        'skipped_sheets': skipped,
+        'seconds': seconds,
+        'rows_per_sec': len(df) / seconds if seconds > 0 else float('inf'),
+        'memory_mb': df.memory_usage(deep=True).sum() / 1024 / 1024,
+    }
+    return df, stats
@@ -0,0 +1,42 @@
+import time
+
+import passwords
+
+
+def logins_per_sec(n, seconds=2.0):
+    # Single-threaded, so this is logins/sec for one core
+    stored = passwords.hash_password('correct horse battery staple', n=n)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        passwords.verify_password('correct horse battery staple', stored)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def cached_logins_per_sec(n, seconds=2.0):
+    stored = passwords.hash_password('correct horse battery staple', n=n)
+    cache = passwords.VerificationCache()
+    cache.add('session', 'user', 'correct horse battery staple', stored)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        cache.check('session', 'user', 'correct horse battery staple', stored)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run(work_factors=(2 ** 12, 2 ** 14, 2 ** 15, 2 ** 16, 2 ** 17)):
+    results = []
+    for n in work_factors:
+        results.append({
+            'n': n,
+            'logins_per_sec_per_core': round(logins_per_sec(n), 1),
+            'cached_checks_per_sec': round(cached_logins_per_sec(n)),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from transforms import normalize_dates
+
+
+def calculate_days_remaining(deadline):
+    # The per-row implementation normalize_dates replaced
+    try:
+        deadline_date = pd.to_datetime(deadline)
+        days = (deadline_date - pd.Timestamp.now()).days
+        return max(days, 0)
+    except:
+        return None
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp('2024-01-01')
+    posted = base + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+    deadline = posted + pd.to_timedelta(rng.integers(1, 90, rows), unit='D')
+    offsets = np.array(['-05:00', '-04:00', '+00:00', ''])[rng.integers(0, 4, rows)]
+    deadline_str = deadline.strftime('%Y-%m-%dT%H:%M:%S').to_numpy().astype(object) + offsets
+    deadline_str[rng.random(rows) < 0.02] = 'N/A'
+    return pd.DataFrame({
+        'postedDate': posted.strftime('%Y-%m-%d'),
+        'responseDeadLine': deadline_str,
+    })
+
+
+def run(sizes=(10_000, 100_000, 1_000_000), apply_limit=100_000):
+    results = []
+    for rows in sizes:
+        df = make_frame(rows)
+
+        start = time.perf_counter()
+        normalize_dates(df.copy())
+        vectorized = time.perf_counter() - start
+
+        result = {'rows': rows, 'vectorized_s': round(vectorized, 4)}
+        if rows <= apply_limit:
+            start = time.perf_counter()
+            df['responseDeadLine'].apply(calculate_days_remaining)
+            legacy = time.perf_counter() - start
+            result.update(apply_s=round(legacy, 4), speedup=round(legacy / vectorized, 1))
+        else:
+            # The apply path takes minutes at this size; raise apply_limit to time it
+            result['apply_s'] = None
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for row in run(apply_limit=limit):
+        print(row)
@@ -0,0 +1,34 @@
+import time
+
+import sam_client
+from benchmarks.mock_sam import MockSamServer
+
+
+def run(total=20000, page_size=1000, latency=0.05, workers=(1, 2, 4, 8)):
+    results = []
+    for max_workers in workers:
+        with MockSamServer(total=total, latency=latency, fail_every=7, overlap=5) as server:
+            start = time.perf_counter()
+            df, reported = sam_client.fetch_all("test-key", {}, page_size=page_size,
+                                                max_workers=max_workers, base_url=server.url)
+            elapsed = time.perf_counter() - start
+
+        ids = df["noticeId"].tolist()
+        assert reported == total, (reported, total)
+        assert len(ids) == total, f"expected {total} unique records, got {len(ids)}"
+        assert ids == sorted(ids), "pages were not merged in offset order"
+        assert server.max_in_flight <= sam_client.MAX_IN_FLIGHT
+
+        results.append({
+            "workers": max_workers,
+            "seconds": round(elapsed, 3),
+            "records_per_sec": round(total / elapsed),
+            "requests": server.requests,
+            "max_in_flight": server.max_in_flight,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for row in run():
+        print(row)
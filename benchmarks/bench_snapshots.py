@@ -0,0 +1,51 @@
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_views import make_frame
+from snapshots import SnapshotStore
+
+
+def changed_copy(df, seed=1, rate=0.01):
+    # The next day's results: some records gone, some new, some edited
+    rng = np.random.default_rng(seed)
+    rows = len(df)
+    new = df.drop(index=rng.choice(rows, int(rows * rate), replace=False))
+    edited = rng.choice(new.index.to_numpy(), int(rows * rate), replace=False)
+    new.loc[edited, 'responseDeadLine'] += pd.Timedelta(days=7)
+    added = make_frame(int(rows * rate), seed=seed)
+    added['noticeId'] = [f"NEW{i:08d}" for i in range(len(added))]
+    return pd.concat([new, added], ignore_index=True)
+
+
+def run(sizes=(10_000, 100_000, 1_000_000)):
+    results = []
+    for rows in sizes:
+        df = make_frame(rows)
+        df.insert(0, 'noticeId', [f"N{i:08d}" for i in range(rows)])
+        later = changed_copy(df)
+        store = SnapshotStore(tempfile.mkdtemp(prefix='capture-snapshots-'))
+        result = {'rows': rows}
+
+        start = time.perf_counter()
+        old_id = store.record('bench', df, 'v1')
+        result['record_s'] = round(time.perf_counter() - start, 3)
+        new_id = store.record('bench', later, 'v2')
+
+        start = time.perf_counter()
+        diff = store.diff(old_id, new_id)
+        result['diff_s'] = round(time.perf_counter() - start, 3)
+        result.update({k: len(v) for k, v in diff.items() if k != 'unchanged'})
+
+        start = time.perf_counter()
+        store.field_changes(old_id, new_id, diff['modified'][:200])
+        result['field_changes_200_s'] = round(time.perf_counter() - start, 3)
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
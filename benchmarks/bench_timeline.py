@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from timeline import lane_density, lane_labels, density_figure, drilldown_figure, DEFAULT_MAX_BARS
+
+AGENCIES = [f"Agency {i}" for i in range(60)]
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    posted = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+    return pd.DataFrame({
+        'title': [f"Opportunity {i}" for i in range(rows)],
+        'postedDate': posted,
+        'responseDeadLine': posted + pd.to_timedelta(rng.integers(1, 90, rows), unit='D'),
+        'fullParentPathName': np.array(AGENCIES)[rng.integers(0, len(AGENCIES), rows)],
+    })
+
+
+def measure(build):
+    start = time.perf_counter()
+    fig = build()
+    payload = fig.to_json()
+    return round(time.perf_counter() - start, 4), len(payload)
+
+
+def run(sizes=(1_000, 10_000, 100_000, 1_000_000), legacy_limit=20_000):
+    results = []
+    for rows in sizes:
+        df = make_frame(rows)
+        result = {'rows': rows}
+
+        result['density_s'], result['density_bytes'] = measure(
+            lambda: density_figure(lane_density(df, 'fullParentPathName', 'W'), 'Agency'))
+        # The busiest lane as the heatmap shows it, usually the pooled 'Other'
+        lane = lane_labels(df, 'fullParentPathName').value_counts().idxmax()
+        fig, in_lane = drilldown_figure(df, 'fullParentPathName', lane, DEFAULT_MAX_BARS)
+        assert in_lane > 0, lane
+        result['drilldown_lane'], result['drilldown_rows'] = lane, in_lane
+        result['drilldown_trace'] = fig.data[0].type
+        result['drilldown_s'], result['drilldown_bytes'] = measure(
+            lambda: drilldown_figure(df, 'fullParentPathName', lane, DEFAULT_MAX_BARS)[0])
+
+        if rows <= legacy_limit:
+            # The one-bar-per-row figure this replaced
+            result['legacy_s'], result['legacy_bytes'] = measure(
+                lambda: px.timeline(df, x_start='postedDate', x_end='responseDeadLine', y='title'))
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    for row in run():
+        print(row)
@@ -0,0 +1,88 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.mock_sam import make_record
+from export import write_xlsx
+
+STATES = [("Arlington", "VA", "22201"), ("Norfolk", "VA", "23510"), ("San Diego", "CA", "92101"),
+          ("Huntsville", "AL", "35801"), ("Dayton", "OH", "45402"), ("Denver", "CO", "80202"),
+          ("Washington", "DC", "20001"), ("Tampa", "FL", "33601")]
+COMPONENTS = ["CBP", "FEMA", "ICE", "TSA", "USCG", "USCIS", "USSS", "CISA", "OPO", "S&T"]
+CONTRACT_TYPES = ["Firm Fixed Price", "Time and Materials", "Cost Plus Fixed Fee", "IDIQ"]
+NAICS = ["541512", "541511", "541519", "541330", "561210", "236220"]
+
+# Maps the APFS columns below onto the standard fields, as a user would in the mapper
+APFS_MAPPING = {
+    'title': 'Requirements Title',
+    'type': 'Contract Type',
+    'postedDate': 'Estimated Solicitation Release',
+    'responseDeadLine': 'Anticipated Award Date',
+    'naicsCode': None,              # falls back to NAICS
+    'fullParentPathName': None,     # falls back to Component
+    'placeOfPerformance': 'Place of Performance',
+}
+
+
+def sam_records(rows):
+    # opportunitiesData-shaped records, with the nested place of performance
+    # and contact structures the API returns
+    records = []
+    for i in range(rows):
+        record = make_record(i)
+        city, state, zip_code = STATES[i % len(STATES)]
+        record["naicsCode"] = NAICS[i % len(NAICS)]
+        record["description"] = f"https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid={record['noticeId']}"
+        record["placeOfPerformance"] = {
+            "city": {"name": city},
+            "state": {"code": state},
+            "zip": zip_code,
+        }
+        record["pointOfContact"] = [{"fullName": f"Contact {i % 97}", "email": f"contact{i % 97}@example.gov"}]
+        record["award"] = {"amount": str((i % 50) * 25_000)} if i % 5 == 0 else None
+        records.append(record)
+    return records
+
+
+def apfs_frame(rows, seed=0):
+    # Shaped like the DHS APFS export the column mapper is built around
+    rng = np.random.default_rng(seed)
+    release = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+    award = release + pd.to_timedelta(rng.integers(30, 240, rows), unit='D')
+    places = np.array([f"{city}, {state} {zip_code}" for city, state, zip_code in STATES])
+    return pd.DataFrame({
+        'APFS Number': [f"F{2024}{i:07d}" for i in range(rows)],
+        'Component': np.array(COMPONENTS)[rng.integers(0, len(COMPONENTS), rows)],
+        'Requirements Title': [f"Requirement {i}" for i in range(rows)],
+        'NAICS': np.array(NAICS)[rng.integers(0, len(NAICS), rows)],
+        'Contract Type': np.array(CONTRACT_TYPES)[rng.integers(0, len(CONTRACT_TYPES), rows)],
+        'Dollar Range': rng.choice(['$250K - $1M', '$1M - $5M', '$5M - $20M', '>$20M'], rows),
+        'Estimated Solicitation Release': release.strftime('%m/%d/%Y'),
+        'Anticipated Award Date': award.strftime('%Y-%m-%d'),
+        'Place of Performance': places[rng.integers(0, len(places), rows)],
+        'Small Business Program': rng.choice(['8(a)', 'HUBZone', 'SDVOSB', 'WOSB', 'None'], rows),
+    })
+
+
+class LocalUpload(io.BytesIO):
+    # Enough of Streamlit's UploadedFile for the ingest path
+    def __init__(self, path, mime):
+        with open(path, 'rb') as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+        self.type = mime
+        self.size = len(self.getbuffer())
+        self.file_id = f"{self.name}:{self.size}"
+
+
+def write_apfs(df, directory, kind):
+    if kind == 'csv':
+        path = os.path.join(directory, f"apfs_{len(df)}.csv")
+        df.to_csv(path, index=False)
+        return LocalUpload(path, 'text/csv')
+    path = os.path.join(directory, f"apfs_{len(df)}.xlsx")
+    with open(path, 'wb') as f:
+        write_xlsx(df, f)
+    return LocalUpload(path, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
@@ -0,0 +1,330 @@
+"""Load test: many concurrent dashboard sessions in one process.
+
+    python -m benchmarks.load_test --sessions 1,5,10,25 --output load.json
+
+Every simulated analyst is a Streamlit AppTest driving streamlit_app.py
+through a scripted flow (log in, search, switch dashboard views, upload a
+file and apply a mapping) against the local mock SAM.gov server. AppTest
+sessions share the process, and so the @st.cache_resource caches, exactly
+like sessions of one `streamlit run` server. For each session count the
+report gives rerun latency percentiles per step, reruns per second and the
+process's resident memory.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(ROOT, 'streamlit_app.py')
+DEFAULT_SESSIONS = (1, 5, 10, 25)
+FLOWS = ('login', 'search', 'views', 'upload')
+PASSWORD = 'load-test-password'
+SEARCH_TIMEOUT = 120         # seconds a session waits for its search to finish
+SEARCH_POLL_SECONDS = 0.25   # how often a waiting session reruns, as the progress fragment would
+RSS_SAMPLE_SECONDS = 0.1
+
+
+def rss_mb():
+    # Current resident set size; falls back to the peak where /proc is missing
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class MemorySampler:
+    # Samples RSS on a background thread while a level runs
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append(rss_mb())
+
+
+class Session:
+    # One analyst: an AppTest plus the latency of every rerun it triggered
+    def __init__(self, index, args, upload):
+        from streamlit.testing.v1 import AppTest
+        self.index = index
+        self.args = args
+        self.upload = upload
+        self.at = AppTest.from_file(APP_FILE, default_timeout=SEARCH_TIMEOUT)
+        self.timings = []
+        self.errors = []
+
+    def rerun(self, step, action=None):
+        start = time.perf_counter()
+        if action is None:
+            self.at.run()
+        else:
+            action.run()
+        self.timings.append((step, time.perf_counter() - start))
+        # The app catches most failures itself and shows them with st.error
+        if self.at.exception:
+            raise RuntimeError(f"{step}: {self.at.exception[0].value}")
+        if self.at.error:
+            raise RuntimeError(f"{step}: {self.at.error[0].value}")
+
+    def expect_success(self, step, prefix):
+        if not any(s.value.startswith(prefix) for s in self.at.success):
+            raise RuntimeError(f"{step}: no \"{prefix}\" message")
+
+    def widget(self, kind, label):
+        return next(w for w in getattr(self.at, kind) if w.label == label)
+
+    def login(self):
+        self.rerun('open')
+        self.at.text_input(key='login_username').set_value(f"loadtest{self.index}")
+        self.at.text_input(key='login_password').set_value(PASSWORD)
+        self.rerun('login', self.widget('button', "Login").click())
+
+    def search(self):
+        self.widget('text_input', "SAM.gov API Key").set_value('load-test-key')
+        if self.args.distinct_searches:
+            # Otherwise every session shares one search and, after the first, one cached result
+            self.widget('text_input', "NAICS Code").set_value(f"{541000 + self.index}")
+        start = time.perf_counter()
+        self.rerun('search', self.widget('button', "🔍 Search Opportunities").click())
+        while not any(s.value.startswith("Found ") for s in self.at.success):
+            if time.perf_counter() - start > SEARCH_TIMEOUT:
+                raise TimeoutError("search did not finish")
+            time.sleep(SEARCH_POLL_SECONDS)
+            self.rerun('search_poll')
+        self.timings.append(('search_complete', time.perf_counter() - start))
+        if not any(r.key == "api_view" for r in self.at.radio):
+            raise RuntimeError("search: results found but the dashboard didn't render")
+
+    def dump(self):
+        return [(type(e).__name__, getattr(e, 'label', None) or getattr(e, 'value', None)) for e in self.at.main]
+
+    def views(self, key):
+        from streamlit_app import DASHBOARD_VIEWS
+        for view in DASHBOARD_VIEWS[1:] + DASHBOARD_VIEWS[:1]:
+            self.rerun(f"view:{view.split(' ', 1)[-1]}", self.at.radio(key=f"{key}_view").set_value(view))
+
+    def upload_and_map(self):
+        from benchmarks.datasets import APFS_MAPPING
+        self.rerun('choose_upload', self.widget('radio', "Choose Data Source").set_value("Uploaded File"))
+        self.rerun('upload', self.at.sidebar.file_uploader[0].set_value(self.upload))
+        for field, column in APFS_MAPPING.items():
+            if column is not None:
+                self.at.selectbox(key=f"map_{field}").set_value(column)
+        self.rerun('apply_mapping', self.widget('button', "Apply Mapping").click())
+        self.expect_success('apply_mapping', "Column mapping applied successfully!")
+
+    def run(self, barrier):
+        try:
+            barrier.wait()
+            self.login()
+            if 'search' in self.args.flows:
+                self.search()
+                if 'views' in self.args.flows:
+                    self.views('api')
+            if 'upload' in self.args.flows:
+                self.upload_and_map()
+                if 'views' in self.args.flows:
+                    self.views('upload')
+        except Exception as e:
+            self.errors.append(f"session {self.index}: {e}")
+            if self.args.verbose:
+                traceback.print_exc()
+                print(self.dump(), file=sys.stderr)
+
+
+def share_runtime():
+    # AppTest installs a mock Runtime singleton at the start of every run and
+    # removes it at the end, so with sessions running side by side one
+    # session's teardown pulls the runtime out from under the others. Give
+    # AppTest a subclass to swap instead and install one shared runtime,
+    # as a real server has
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    class SessionRuntime(Runtime):
+        pass
+
+    runtime = app_test.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    app_test.Runtime = SessionRuntime
+    Runtime._instance = runtime
+
+
+def percentiles(seconds):
+    values = np.asarray(seconds) * 1000
+    return {
+        'count': len(values),
+        'p50_ms': round(float(np.percentile(values, 50)), 1),
+        'p95_ms': round(float(np.percentile(values, 95)), 1),
+        'p99_ms': round(float(np.percentile(values, 99)), 1),
+        'max_ms': round(float(values.max()), 1),
+    }
+
+
+def stage_table(profiler, limit=20):
+    stats = profiler.stage_stats().round(1).head(limit)
+    return stats.astype(object).where(stats.notna(), None).to_dict('records')
+
+
+def reset_state():
+    # Each level starts cold: no cached searches, datasets or snapshots
+    import streamlit as st
+    st.cache_resource.clear()
+    for path in ('opportunity_cache.db', 'dataset_store', 'snapshots'):
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def run_level(sessions, args, upload):
+    from profiling import profiler
+    reset_state()
+    profiler.clear()
+    group = [Session(i, args, upload) for i in range(sessions)]
+    barrier = threading.Barrier(sessions)
+    threads = [threading.Thread(target=s.run, args=(barrier,), name=f"session-{s.index}") for s in group]
+
+    rss_before = rss_mb()
+    with MemorySampler() as memory:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+    timings = pd.DataFrame([t for s in group for t in s.timings], columns=['step', 'seconds'])
+    reruns = timings[~timings['step'].isin(['search_complete'])]
+    return {
+        'sessions': sessions,
+        'wall_s': round(wall, 2),
+        'reruns': len(reruns),
+        'reruns_per_sec': round(len(reruns) / wall, 2) if wall else None,
+        'rerun_latency': percentiles(reruns['seconds']) if len(reruns) else None,
+        'steps': {step: percentiles(group['seconds']) for step, group in timings.groupby('step', sort=False)},
+        'rss_mb': {
+            'before': round(rss_before, 1),
+            'peak': round(max(memory.samples), 1),
+            'after': round(memory.samples[-1], 1),
+        },
+        'errors': [e for s in group for e in s.errors],
+        # Per-stage timings from the app's own profiler, when --profile is on
+        'stages': stage_table(profiler) if profiler.enabled else None,
+    }
+
+
+def run(session_counts=DEFAULT_SESSIONS, args=None, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix='capture-load-')
+    os.chdir(workdir)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    import sam_client
+    import streamlit.config
+    import streamlit.logger
+    from passwords import hash_password
+    from user_store import get_user_store
+    from benchmarks.datasets import sam_records, apfs_frame
+    from benchmarks.mock_sam import MockSamServer
+    streamlit.logger.set_log_level('error')
+    # AppTest compiles the script on every run, and magic's ast.parse isn't
+    # thread-safe on some CPython 3.11 releases; the app uses no magic
+    streamlit.config.set_option('runner.magicEnabled', False)
+    share_runtime()
+
+    if args.profile:
+        from profiling import profiler
+        profiler.configure(True)
+
+    store = get_user_store()
+    password_hash = hash_password(PASSWORD)
+    for i in range(max(session_counts)):
+        store.upsert(f"loadtest{i}", password_hash, f"loadtest{i}@example.com")
+
+    upload = (f"apfs_{args.upload_rows}.csv", apfs_frame(args.upload_rows).to_csv(index=False).encode(), 'text/csv')
+    levels = []
+    with MockSamServer(latency=args.latency, records=sam_records(args.records)) as server:
+        sam_client.SAM_SEARCH_URL = server.url
+        for sessions in session_counts:
+            requests_before = server.requests
+            level = run_level(sessions, args, upload)
+            level['mock_requests'] = server.requests - requests_before
+            levels.append(level)
+            print(json.dumps({k: level[k] for k in ('sessions', 'wall_s', 'reruns', 'reruns_per_sec',
+                                                     'rerun_latency', 'rss_mb')}), file=sys.stderr)
+            for error in level['errors']:
+                print(f"  {error}", file=sys.stderr)
+
+    return {
+        'meta': {
+            'created_at': pd.Timestamp.now(tz='UTC').isoformat(),
+            'records': args.records,
+            'upload_rows': args.upload_rows,
+            'latency': args.latency,
+            'flows': list(args.flows),
+            'distinct_searches': args.distinct_searches,
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+        },
+        'levels': levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', default=','.join(map(str, DEFAULT_SESSIONS)),
+                        help="comma separated session counts, one level each")
+    parser.add_argument('--flows', default=','.join(FLOWS), help=f"any of {','.join(FLOWS)}; login always runs")
+    parser.add_argument('--records', type=int, default=5_000, help="records the mock search returns")
+    parser.add_argument('--upload-rows', type=int, default=5_000)
+    parser.add_argument('--latency', type=float, default=0.05, help="mock server seconds per page")
+    parser.add_argument('--distinct-searches', action='store_true',
+                        help="give every session its own search instead of one shared one")
+    parser.add_argument('--profile', action='store_true',
+                        help="turn on the app's stage profiler and report its timings per level")
+    parser.add_argument('--output', default=None, help="write results as JSON to this path")
+    parser.add_argument('--verbose', action='store_true', help="print tracebacks of failed sessions")
+    args = parser.parse_args()
+    args.flows = tuple(f for f in args.flows.split(',') if f)
+
+    output = os.path.abspath(args.output) if args.output else None
+    report = run([int(s) for s in args.sessions.split(',')], args)
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
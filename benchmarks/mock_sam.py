@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TYPES = ["Solicitation", "Award Notice", "Presolicitation", "Sources Sought"]
+AGENCIES = [
+    "DEPARTMENT OF DEFENSE.DEPT OF THE ARMY",
+    "DEPARTMENT OF DEFENSE.DEPT OF THE NAVY",
+    "HOMELAND SECURITY, DEPARTMENT OF",
+    "HEALTH AND HUMAN SERVICES, DEPARTMENT OF",
+    "VETERANS AFFAIRS, DEPARTMENT OF",
+]
+SET_ASIDES = [None, "SBA", "8A", "HZC", "SDVOSBC", "WOSB"]
+
+
+def make_record(i, now=None):
+    now = now or datetime(2024, 1, 1)
+    posted = now - timedelta(days=i % 365)
+    return {
+        "noticeId": f"N{i:08d}",
+        "title": f"Synthetic opportunity {i}",
+        "type": TYPES[i % len(TYPES)],
+        "postedDate": posted.strftime("%Y-%m-%d"),
+        "responseDeadLine": (posted + timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%S-05:00"),
+        "naicsCode": "541512",
+        "fullParentPathName": AGENCIES[i % len(AGENCIES)],
+        "typeOfSetAside": SET_ASIDES[i % len(SET_ASIDES)],
+        "uiLink": f"https://sam.gov/opp/N{i:08d}/view",
+    }
+
+
+class MockSamServer:
+    # Local stand-in for /opportunities/v2/search. `fail_every` answers every
+    # nth request with 429 and a Retry-After of `retry_after` seconds,
+    # `overlap` repeats the tail of the previous page (SAM.gov does this when
+    # records are posted mid-pagination).
+    def __init__(self, total=5000, latency=0.05, fail_every=0, overlap=0, records=None, retry_after=0):
+        self.records = records if records is not None else [make_record(i) for i in range(total)]
+        self.latency = latency
+        self.fail_every = fail_every
+        self.overlap = overlap
+        self.retry_after = retry_after
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/opportunities/v2/search"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", ["1000"])[0])
+                set_aside = query.get("typeOfSetAside", [None])[0]
+
+                with mock._lock:
+                    mock.requests += 1
+                    count = mock.requests
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                try:
+                    time.sleep(mock.latency)
+                    if mock.fail_every and count % mock.fail_every == 0:
+                        self._send(429, {"error": "rate limited"}, {"Retry-After": str(mock.retry_after)})
+                        return
+                    records = mock.records
+                    if set_aside:
+                        records = [r for r in records if r.get("typeOfSetAside") == set_aside]
+                    start = max(0, offset - mock.overlap) if offset else 0
+                    body = {
+                        "totalRecords": len(records),
+                        "limit": limit,
+                        "offset": offset,
+                        "opportunitiesData": records[start:offset + limit],
+                    }
+                    self._send(200, body)
+                finally:
+                    with mock._lock:
+                        mock.in_flight -= 1
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
@@ -0,0 +1,250 @@
+"""Headless benchmark suite for the dashboard's data paths.
+
+    python -m benchmarks.run_suite --sizes 1000,10000,100000 --output bench.json
+    python -m benchmarks.run_suite --compare before.json after.json
+
+Each stage calls the same functions streamlit_app.py runs on a rerun, with
+Streamlit in bare mode (no browser or server) and SAM.gov replaced by the
+local mock server. Every stage is timed once without tracemalloc and, unless
+--no-memory is given, run again under tracemalloc for its peak allocation.
+A stage that raises is recorded with its error and the time it ran for, and
+the stages that need its result are skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+REGRESSION_THRESHOLD = 1.25
+NOISE_SECONDS = 0.01  # smaller slowdowns are never reported as regressions
+
+
+def measure(fn, memory=True, repeat=3):
+    # Best of `repeat` wall times, then one traced run for the peak
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        del result
+        tracemalloc.start()
+        try:
+            result = fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak_mb
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=ROOT).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(sizes=DEFAULT_SIZES, memory=True, repeat=3, fetch_limit=100_000, xlsx_limit=50_000, workdir=None):
+    # The app keeps its caches and dataset store relative to the working
+    # directory, so every run starts from an empty one
+    workdir = workdir or tempfile.mkdtemp(prefix='capture-bench-')
+    os.chdir(workdir)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    import sam_client
+    import streamlit.logger
+    import streamlit_app as app
+    # Bare mode logs a missing-context warning for every widget call
+    streamlit.logger.set_log_level('error')
+    from benchmarks.datasets import sam_records, apfs_frame, write_apfs, APFS_MAPPING
+    from benchmarks.mock_sam import MockSamServer
+
+    results = []
+
+    def record(rows, stage, fn):
+        # Returns the stage's result, or None if it failed
+        start = time.perf_counter()
+        try:
+            result, seconds, peak_mb = measure(fn, memory, repeat)
+        except Exception as e:
+            results.append({
+                'rows': rows,
+                'stage': stage,
+                'seconds': round(time.perf_counter() - start, 4),
+                'rows_per_sec': None,
+                'peak_mb': None,
+                'error': f"{type(e).__name__}: {e}",
+            })
+            print(json.dumps(results[-1]), file=sys.stderr)
+            return None
+        results.append({
+            'rows': rows,
+            'stage': stage,
+            'seconds': round(seconds, 4),
+            'rows_per_sec': round(rows / seconds) if seconds else None,
+            'peak_mb': None if peak_mb is None else round(peak_mb, 1),
+        })
+        print(json.dumps(results[-1]), file=sys.stderr)
+        return result
+
+    def fresh_fetch(url, rows):
+        app.get_shared_results().invalidate()
+        app.get_opportunity_cache().clear()
+        app.release_fetch_job()
+        sam_client.SAM_SEARCH_URL = url
+        result = app.fetch_opportunities('bench-key', date_range=365)
+        if isinstance(result, app.FetchJob):
+            # The fetch runs on a background thread; a rerun would poll, we wait
+            result.join()
+            if result.error is not None:
+                raise result.error
+            result = result.result
+        df, total, _ = result
+        if total != rows or len(df) != rows:
+            raise AssertionError(f"fetched {len(df)} of {total} records, expected {rows}")
+        # Drop the version stamp so later stages compute instead of hitting the app's caches
+        df = df.copy(deep=False)
+        df.attrs = {}
+        return df, total
+
+    def ingest(upload):
+        upload.seek(0)
+        df = app.process_uploaded_file(upload)
+        if df is None:
+            # The app reports the failure with st.error and carries on
+            raise RuntimeError("process_uploaded_file returned no data")
+        return df
+
+    for rows in sizes:
+        if rows <= fetch_limit:
+            with MockSamServer(latency=0, records=sam_records(rows)) as server:
+                fetched = record(rows, 'fetch', lambda: fresh_fetch(server.url, rows))
+            if fetched is not None:
+                api_df, _ = fetched
+                record(rows, 'api_metrics', lambda: app.compute_rollups(api_df))
+                record(rows, 'api_geographic_map', lambda: app.create_geographic_map(api_df, key='bench'))
+                del api_df, fetched
+
+        source = apfs_frame(rows)
+        uploaded = None
+        for kind in ('csv', 'excel'):
+            if kind == 'excel' and rows > xlsx_limit:
+                continue
+            upload = write_apfs(source, workdir, 'csv' if kind == 'csv' else 'xlsx')
+            result = record(rows, f'ingest_{kind}', lambda: ingest(upload))
+            if result is not None:
+                uploaded = result
+            del result
+        del source
+
+        if uploaded is None:
+            continue
+        spec = app.mapping_spec(APFS_MAPPING)
+        mapped = record(rows, 'mapping', lambda: app.to_records(app.apply_mapping(uploaded, spec))[0])
+        del uploaded
+        if mapped is None:
+            continue
+        if record(rows, 'normalize_dates', lambda: app.normalize_dates(mapped.copy())) is None:
+            continue
+        df = app.normalize_dates(mapped)
+        del mapped
+
+        record(rows, 'metrics', lambda: app.compute_rollups(df))
+        record(rows, 'display_metrics', lambda: app.display_metrics(df))
+        record(rows, 'analytics_charts', lambda: app.render_analytics(df))
+        record(rows, 'timeline_charts', lambda: app.render_timeline(df, key='bench'))
+        record(rows, 'geographic_map', lambda: app.create_geographic_map(df, key='bench'))
+        del df
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'memory': memory,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(before, after, threshold=REGRESSION_THRESHOLD):
+    # Prints per-stage ratios (after / before); returns the regressed stages
+    old = {(r['rows'], r['stage']): r for r in before['results']}
+    regressions = []
+    for result in after['results']:
+        previous = old.get((result['rows'], result['stage']))
+        if previous is None:
+            continue
+        if 'error' in result or 'error' in previous:
+            # A stage that newly fails is a regression; one that recovered isn't
+            failed = 'error' in result and 'error' not in previous
+            if failed:
+                regressions.append(result)
+            print(f"{result['stage']:>20} {result['rows']:>9,} rows  "
+                  + (f"failed: {result['error']}  <- regression" if failed
+                     else "failed before" if 'error' not in result else "failed in both"))
+            continue
+        line = f"{result['stage']:>20} {result['rows']:>9,} rows  time x{result['seconds'] / max(previous['seconds'], 1e-9):.2f}"
+        slower = (result['seconds'] > previous['seconds'] * threshold
+                  and result['seconds'] - previous['seconds'] > NOISE_SECONDS)
+        if result['peak_mb'] is not None and previous['peak_mb'] is not None:
+            ratio = result['peak_mb'] / max(previous['peak_mb'], 0.1)
+            line += f"  peak x{ratio:.2f}"
+            slower = slower or (ratio > threshold and result['peak_mb'] - previous['peak_mb'] >= 1)
+        if slower:
+            regressions.append(result)
+            line += "  <- regression"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--output', default=None, help="write results as JSON to this path")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage; the best is kept")
+    parser.add_argument('--fetch-limit', type=int, default=100_000,
+                        help="largest dataset served through the mock API")
+    parser.add_argument('--xlsx-limit', type=int, default=50_000, help="largest dataset ingested as xlsx")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="after/before ratio reported as a regression by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        sys.exit(1 if compare(before, after, args.threshold) else 0)
+
+    output = os.path.abspath(args.output) if args.output else None
+    report = run([int(s) for s in args.sizes.split(',')], memory=not args.no_memory, repeat=args.repeat,
+                 fetch_limit=args.fetch_limit, xlsx_limit=args.xlsx_limit)
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
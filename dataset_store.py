@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import pyarrow.feather as feather
+
+STORE_DIR = 'dataset_store'
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    if hasattr(file, 'getbuffer'):
+        buffer = file.getbuffer()
+        for start in range(0, len(buffer), HASH_BLOCK_SIZE):
+            digest.update(buffer[start:start + HASH_BLOCK_SIZE])
+    else:
+        file.seek(0)
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+        file.seek(0)
+    return digest.hexdigest()
+
+
+def _arrow_safe(df):
+    # Spreadsheet columns often mix numbers and text, which Arrow can't store
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            kind = pd.api.types.infer_dtype(series.cat.categories, skipna=True)
+            if kind in ('mixed', 'mixed-integer'):
+                df[column] = series.cat.rename_categories(series.cat.categories.astype(str))
+        elif series.dtype == object:
+            kind = pd.api.types.infer_dtype(series, skipna=True)
+            if kind in ('mixed', 'mixed-integer'):
+                df[column] = series.astype(str).where(series.notna(), None)
+    return df
+
+
+class DatasetStore:
+    def __init__(self, root=STORE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS datasets (
+                digest TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                columns INTEGER NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def path(self, digest):
+        return os.path.join(self.root, f"{digest}.feather")
+
+    def contains(self, digest):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM datasets WHERE digest = ?", (digest,)).fetchone()
+        return row is not None and os.path.exists(self.path(digest))
+
+    def put(self, digest, df, name):
+        # Uncompressed Feather so later reads can memory-map the file
+        path = self.path(digest)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        feather.write_feather(_arrow_safe(df).reset_index(drop=True), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO datasets "
+                "(digest, name, rows, columns, size_bytes, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest, name, len(df), len(df.columns), os.path.getsize(path), now, now)
+            )
+            self._evict(keep=digest)
+            self._conn.commit()
+
+    def _touch(self, digest):
+        with self._lock:
+            self._conn.execute("UPDATE datasets SET accessed_at = ? WHERE digest = ?", (time.time(), digest))
+            self._conn.commit()
+
+    def columns(self, digest):
+        return feather.read_table(self.path(digest), memory_map=True).schema.names
+
+    def preview(self, digest, rows=5):
+        table = feather.read_table(self.path(digest), memory_map=True)
+        return table.slice(0, rows).to_pandas()
+
+    def load(self, digest, columns=None):
+        self._touch(digest)
+        return feather.read_feather(self.path(digest), columns=columns, memory_map=True)
+
+    def _evict(self, keep=None):
+        # Least recently used datasets go first once the store is over budget
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM datasets").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT digest, size_bytes FROM datasets ORDER BY accessed_at").fetchall()
+        for digest, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            self._remove(digest)
+            total -= size_bytes
+
+    def _remove(self, digest):
+        self._conn.execute("DELETE FROM datasets WHERE digest = ?", (digest,))
+        try:
+            os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, digest):
+        with self._lock:
+            self._remove(digest)
+            self._conn.commit()
+
+    def list(self):
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT digest, name, rows, columns, size_bytes, created_at, accessed_at "
+                "FROM datasets ORDER BY accessed_at DESC",
+                self._conn
+            )
+        df['size_mb'] = df.pop('size_bytes') / 1024 / 1024
+        df['created_at'] = pd.to_datetime(df['created_at'], unit='s')
+        df['accessed_at'] = pd.to_datetime(df['accessed_at'], unit='s')
+        return df
@@ -0,0 +1,125 @@
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+CHUNK_ROWS = 50_000
+SPOOL_MAX_BYTES = 16 * 1024 * 1024  # larger artifacts spill to a temp file on disk
+MAX_ARTIFACTS = 4
+
+# label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _plain_values(chunk, naive_datetimes=True):
+    # Text for the nested dicts/lists SAM.gov records carry and for mixed
+    # spreadsheet columns; Excel also needs naive datetimes
+    columns = {}
+    for column in chunk.columns:
+        series = chunk[column]
+        if naive_datetimes and isinstance(series.dtype, pd.DatetimeTZDtype):
+            series = series.dt.tz_convert(None)
+        elif series.dtype == object:
+            kind = pd.api.types.infer_dtype(series, skipna=True)
+            if kind not in ('string', 'empty'):
+                series = series.map(lambda v: v if v is None else str(v))
+        columns[column] = series
+    return pd.DataFrame(columns, index=chunk.index)
+
+
+def write_csv(df, f, chunk_rows=CHUNK_ROWS):
+    f.write(df.iloc[:0].to_csv(index=False).encode('utf-8'))
+    for chunk in iter_chunks(df, chunk_rows):
+        f.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+
+
+def write_xlsx(df, f, chunk_rows=CHUNK_ROWS):
+    # Write-only mode streams rows to the zip instead of holding a cell grid
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Opportunities")
+    sheet.append([str(c) for c in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        values = _plain_values(chunk).astype(object)
+        values = values.where(values.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(f)
+
+
+def _parquet_schema(df):
+    # Fixed up front so every chunk is written with the same column types
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    for i, field in enumerate(schema):
+        if df[field.name].dtype == object:
+            schema = schema.set(i, pa.field(field.name, pa.string()))
+    return schema
+
+
+def write_parquet(df, f, chunk_rows=CHUNK_ROWS):
+    schema = _parquet_schema(df)
+    with pq.ParquetWriter(f, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            table = pa.Table.from_pandas(_plain_values(chunk, naive_datetimes=False),
+                                         schema=schema, preserve_index=False)
+            writer.write_table(table)
+
+
+WRITERS = {
+    'CSV': write_csv,
+    'Excel': write_xlsx,
+    'Parquet': write_parquet,
+}
+
+
+def export_to_file(df, fmt, chunk_rows=CHUNK_ROWS):
+    f = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        WRITERS[fmt](df, f, chunk_rows)
+    except BaseException:
+        f.close()
+        raise
+    f.seek(0)
+    return f
+
+
+class ExportCache:
+    # Finished artifacts keyed by (dataset version, format), built only when a
+    # download is actually requested. The oldest are closed (and their temp
+    # files deleted) past max_entries
+    def __init__(self, max_entries=MAX_ARTIFACTS):
+        self.max_entries = max_entries
+        self._artifacts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, version, fmt, build_df):
+        key = (version, fmt)
+        with self._lock:
+            artifact = self._artifacts.get(key)
+            if artifact is None:
+                artifact = export_to_file(build_df(), fmt)
+                self._artifacts[key] = artifact
+                while len(self._artifacts) > self.max_entries:
+                    _, evicted = self._artifacts.popitem(last=False)
+                    evicted.close()
+            self._artifacts.move_to_end(key)
+            artifact.seek(0)
+            return artifact.read()
+
+    def clear(self):
+        with self._lock:
+            for artifact in self._artifacts.values():
+                artifact.close()
+            self._artifacts.clear()
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pandas as pd
+
+from sam_client import FetchCancelled
+
+
+class FetchJob:
+    # One search running on a background thread. Pages are collected as they
+    # arrive so reruns can render what is there so far; the finished result
+    # (or error) is picked up by the next rerun after the thread ends
+    def __init__(self, key, compute):
+        self.key = key
+        self.state = 'running'  # running, done, error or cancelled
+        self.result = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cancelled = threading.Event()
+        self.subscribers = set()
+        self._frames = {}
+        self._total = None
+        self._snapshot = None
+        self._snapshot_pages = 0
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, args=(compute,), daemon=True,
+                                        name=f"fetch-{key[:8]}")
+        self._on_finish = None
+
+    def start(self, on_finish=None):
+        self._on_finish = on_finish
+        self._thread.start()
+        return self
+
+    def _run(self, compute):
+        try:
+            result = compute(self)
+            state, error = 'done', None
+        except FetchCancelled:
+            result, state, error = None, 'cancelled', None
+        except Exception as e:
+            result, state, error = None, 'error', e
+        with self._changed:
+            self.result, self.state, self.error = result, state, error
+            self.finished_at = time.time()
+            self._changed.notify_all()
+        if self._on_finish is not None:
+            self._on_finish(self)
+
+    def add_page(self, offset, frame, total):
+        with self._changed:
+            self._frames[offset] = frame
+            self._total = total
+            self._changed.notify_all()
+
+    def wait(self, timeout):
+        # Until the first page lands or the job ends; True if either happened
+        with self._changed:
+            return self._changed.wait_for(lambda: self._frames or self.state != 'running', timeout)
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def progress(self):
+        # (pages done, pages expected or None, rows loaded)
+        with self._changed:
+            frames = list(self._frames.values())
+            total = self._total
+        page_size = max((len(f) for f in frames), default=0)
+        expected = -(-total // page_size) if total and page_size else None
+        return len(frames), expected, sum(len(f) for f in frames)
+
+    def snapshot(self):
+        # Pages received so far, in offset order; rebuilt only when a page arrives
+        with self._changed:
+            if not self._frames:
+                return None
+            if self._snapshot_pages != len(self._frames):
+                df = pd.concat([self._frames[o] for o in sorted(self._frames)], ignore_index=True)
+                if 'noticeId' in df.columns:
+                    df = df.drop_duplicates(subset='noticeId', keep='first').reset_index(drop=True)
+                self._snapshot, self._snapshot_pages = df, len(self._frames)
+            return self._snapshot
+
+
+class FetchJobRegistry:
+    # Running jobs by search key, shared across sessions: a second session
+    # asking for the same search watches the same job. A job is cancelled when
+    # its last watcher releases it, and forgotten once it finishes
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, subscriber, compute):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.cancelled.is_set():
+                job = FetchJob(key, compute)
+                self._jobs[key] = job
+                job.start(on_finish=self._forget)
+            job.subscribers.add(subscriber)
+            return job
+
+    def release(self, job, subscriber):
+        with self._lock:
+            job.subscribers.discard(subscriber)
+            if not job.subscribers and job.state == 'running':
+                job.cancel()
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+    def _forget(self, job):
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def running(self):
+        with self._lock:
+            return list(self._jobs.values())
@@ -0,0 +1,135 @@
+import csv
+import os
+import re
+from functools import lru_cache
+
+import pandas as pd
+import plotly.express as px
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'us_states.csv')
+
+# "Arlington, VA 22201" / "Norfolk, Virginia" style free text from uploads
+PLACE_PATTERN = re.compile(r'^\s*(?P<city>[^,]+?)?\s*,\s*(?P<state>[A-Za-z .]+?)\s*(?P<zip>\d{5})?(?:-\d{4})?\s*$')
+ZIP_PATTERN = re.compile(r'\b(\d{5})(?:-\d{4})?\b')
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer(path=GAZETTEER_FILE):
+    # Returns ({code: name}, {lowercase name or code: code}, {zip3: code})
+    names, aliases, zip3 = {}, {}, {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            code = row['code']
+            names[code] = row['name']
+            aliases[code.lower()] = code
+            aliases[row['name'].lower()] = code
+            for part in row['zip3'].split(';'):
+                low, _, high = part.partition('-')
+                for prefix in range(int(low), int(high or low) + 1):
+                    zip3[f"{prefix:03d}"] = code
+    return names, aliases, zip3
+
+
+@lru_cache(maxsize=4096)
+def resolve_state(value):
+    if not value:
+        return None
+    _, aliases, _ = load_gazetteer()
+    return aliases.get(str(value).strip().strip('.').lower())
+
+
+@lru_cache(maxsize=65536)
+def zip_to_state(zip_code):
+    if not zip_code:
+        return None
+    _, _, zip3 = load_gazetteer()
+    return zip3.get(str(zip_code).strip()[:3])
+
+
+def _nested(value, key):
+    inner = value.get(key) if isinstance(value, dict) else None
+    if isinstance(inner, dict):
+        return inner.get('code') or inner.get('name')
+    return inner
+
+
+@lru_cache(maxsize=65536)
+def _parse_place_text(text):
+    match = PLACE_PATTERN.match(text)
+    if match:
+        return match.group('city'), match.group('state'), match.group('zip')
+    zip_match = ZIP_PATTERN.search(text)
+    return None, text, zip_match.group(1) if zip_match else None
+
+
+def _split_place(value):
+    # SAM.gov sends {"city": {...}, "state": {...}, "zip": ...}; uploads send text
+    if isinstance(value, dict):
+        city = value.get('city')
+        city = city.get('name') if isinstance(city, dict) else city
+        return city, _nested(value, 'state'), value.get('zip')
+    if isinstance(value, str) and value.strip() and value.strip() != 'N/A':
+        return _parse_place_text(value.strip())
+    return None, None, None
+
+
+def normalize_place_of_performance(series):
+    # Free-text parsing and state lookups are memoized, so repeated values are cheap
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Typed records: resolve each distinct place once, then expand by code
+        categories = normalize_place_of_performance(pd.Series(series.cat.categories, dtype=object))
+        codes = series.cat.codes.to_numpy()
+        places = categories.reindex(codes)
+        places.index = series.index
+        return places
+    if len(series):
+        city, state_raw, zip_code = zip(*(_split_place(value) for value in series))
+    else:
+        city, state_raw, zip_code = (), (), ()
+    places = pd.DataFrame({'city': city, 'state_raw': state_raw, 'zip': zip_code}, index=series.index)
+
+    states = places['state_raw'].map(lambda v: resolve_state(v) if isinstance(v, str) else None)
+    from_zip = places['zip'].map(lambda v: zip_to_state(str(v)[:5]) if v else None)
+    places['state'] = states.fillna(from_zip)
+    return places.drop(columns='state_raw')
+
+
+def award_amounts(df):
+    if 'award' not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    if pd.api.types.is_numeric_dtype(df['award']):
+        return df['award'].fillna(0.0)
+    amounts = df['award'].map(lambda a: a.get('amount') if isinstance(a, dict) else a)
+    return pd.to_numeric(amounts, errors='coerce').fillna(0.0)
+
+
+def aggregate_by_state(df):
+    names, _, _ = load_gazetteer()
+    places = normalize_place_of_performance(df['placeOfPerformance'])
+    days = df['days_remaining'] if 'days_remaining' in df.columns else pd.Series(0, index=df.index)
+    frame = pd.DataFrame({
+        'state': places['state'],
+        'count': 1,
+        'active': (days > 0).astype('int64'),
+        'award_total': award_amounts(df),
+    })
+    totals = frame.dropna(subset=['state']).groupby('state', as_index=False).sum()
+    totals['state_name'] = totals['state'].map(names)
+    return totals, int(places['state'].isna().sum())
+
+
+def choropleth_figure(totals, value='count'):
+    labels = {'count': 'Opportunities', 'active': 'Active', 'award_total': 'Award Total ($)'}
+    fig = px.choropleth(
+        totals,
+        locations='state',
+        locationmode='USA-states',
+        color=value,
+        scope='usa',
+        hover_name='state_name',
+        hover_data={'state': False, 'count': True, 'active': True, 'award_total': ':,.0f'},
+        color_continuous_scale='Blues',
+        labels=labels,
+        title="Opportunities by Place of Performance"
+    )
+    return fig
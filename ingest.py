@@ -0,0 +1,199 @@
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+EXCEL_TYPES = ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"]
+CSV_TYPES = ["text/csv"]
+
+CHUNK_ROWS = 50000
+CHUNK_BYTES = 16 * 1024 * 1024  # pyarrow CSV block size; each block becomes one chunk
+CATEGORY_RATIO = 0.5  # object columns with fewer unique values than this share become categoricals
+
+
+def rss_mb():
+    # Current resident set size; the peak where /proc isn't available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def file_kind(uploaded_file):
+    name = (getattr(uploaded_file, 'name', '') or '').lower()
+    if uploaded_file.type in EXCEL_TYPES or name.endswith(('.xlsx', '.xls')):
+        return 'excel'
+    if uploaded_file.type in CSV_TYPES or name.endswith('.csv'):
+        return 'csv'
+    return None
+
+
+def _rewind(file):
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return file
+
+
+def _open_sheet(file, sheet=None):
+    import openpyxl
+    workbook = openpyxl.load_workbook(_rewind(file), read_only=True, data_only=True)
+    return workbook, workbook[sheet] if sheet is not None else workbook.worksheets[0]
+
+
+def sheet_names(file):
+    import openpyxl
+    workbook = openpyxl.load_workbook(_rewind(file), read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def compact_dtypes(df):
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if len(series) and series.nunique(dropna=True) < CATEGORY_RATIO * len(series):
+                df[column] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            # Integer columns with blanks come back as float64
+            non_null = series.dropna()
+            if len(non_null) and (non_null % 1 == 0).all():
+                df[column] = series.astype('Int64')
+    return df
+
+
+def concat_compact(chunks):
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+
+    columns = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[column] = pd.Series(union_categoricals(parts, ignore_order=True))
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return compact_dtypes(pd.DataFrame(columns))
+
+
+def iter_xlsx_chunks(file, usecols=None, chunk_rows=CHUNK_ROWS, sheet=None):
+    # openpyxl read-only mode streams rows from the sheet XML instead of
+    # building the whole workbook in memory
+    workbook, sheet = _open_sheet(file, sheet)
+    try:
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(value) if value is not None else '' for value in next(rows, ())]
+        wanted = [i for i, name in enumerate(header) if usecols is None or name in usecols]
+        names = [header[i] for i in wanted]
+
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in wanted])
+            if len(buffer) >= chunk_rows:
+                yield compact_dtypes(pd.DataFrame(buffer, columns=names))
+                buffer = []
+        if buffer or not names:
+            yield compact_dtypes(pd.DataFrame(buffer, columns=names))
+    finally:
+        workbook.close()
+
+
+def _iter_arrow_csv(file, usecols=None, block_size=CHUNK_BYTES):
+    # Record batches of about block_size bytes of CSV, parsed multithreaded
+    # into columnar buffers; only one block is held in Arrow form at a time
+    import pyarrow.csv as pacsv
+    reader = pacsv.open_csv(
+        _rewind(file),
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(include_columns=list(usecols) if usecols else [])
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def iter_csv_chunks(file, usecols=None, chunk_rows=CHUNK_ROWS):
+    rows = 0
+    if HAS_PYARROW:
+        import pyarrow as pa
+        try:
+            for chunk in _iter_arrow_csv(file, usecols):
+                rows += len(chunk)
+                yield compact_dtypes(chunk)
+            return
+        except pa.ArrowInvalid:
+            # Column types are inferred from the first block; when a later
+            # block doesn't fit them, pandas reads on from where Arrow stopped
+            pass
+    for chunk in pd.read_csv(_rewind(file), usecols=usecols, chunksize=chunk_rows, low_memory=True,
+                             skiprows=range(1, rows + 1)):
+        yield compact_dtypes(chunk)
+
+
+def ingest(file, kind, usecols=None, on_progress=None, trace_memory=False, sheet=None):
+    # Returns (df, stats) where stats has rows, seconds, rows_per_sec,
+    # peak_mb (growth of resident memory at its highest, sampled after every
+    # chunk) and rss_delta_mb. tracemalloc is process-wide and slows every
+    # session's allocations, so traced_peak_mb is only measured when
+    # trace_memory is set
+    rss_before = rss_mb()
+    rss_peak = rss_before
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+
+    try:
+        if kind == 'excel':
+            reader = iter_xlsx_chunks(file, usecols, sheet=sheet)
+        else:
+            reader = iter_csv_chunks(file, usecols)
+        chunks = []
+        rows = 0
+        for chunk in reader:
+            chunks.append(chunk)
+            rows += len(chunk)
+            rss_peak = max(rss_peak, rss_mb())
+            if on_progress is not None:
+                on_progress(rows)
+        df = concat_compact(chunks)
+        rss_peak = max(rss_peak, rss_mb())
+        del chunks
+
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    stats = {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'seconds': seconds,
+        'rows_per_sec': len(df) / seconds if seconds > 0 else float('inf'),
+        'peak_mb': rss_peak - rss_before,
+        'traced_peak_mb': None if peak is None else peak / 1024 / 1024,
+        'rss_delta_mb': rss_mb() - rss_before,
+        'memory_mb': df.memory_usage(deep=True).sum() / 1024 / 1024,
+    }
+    return df, stats
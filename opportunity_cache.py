@@ -0,0 +1,217 @@
+import hashlib
+import io
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from sam_client import fetch_all, fetch_page
+
+CACHE_DB_FILE = 'opportunity_cache.db'
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Sidebar set-aside choices -> SAM.gov typeOfSetAside codes
+SET_ASIDE_CODES = {
+    "Small Business": "SBA",
+    "8(a)": "8A",
+    "HUBZone": "HZC",
+    "SDVOSB": "SDVOSBC",
+    "WOSB": "WOSB",
+}
+
+
+def set_aside_code(set_aside):
+    return SET_ASIDE_CODES.get(set_aside, set_aside) if set_aside else None
+
+
+def normalize_params(naics=None, agency=None, date_range=30, opportunity_type=None, set_aside=None):
+    params = {
+        "ncode": (naics or "").strip(),
+        "organizationName": (agency or "").strip().lower(),
+        "date_range": int(date_range),
+        "type": opportunity_type or "",
+    }
+    # Only present when set, so searches without one keep their cache keys
+    if set_aside:
+        params["typeOfSetAside"] = set_aside_code(set_aside)
+    return params
+
+
+def make_key(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def newest_posted_date(df):
+    if df is None or df.empty or 'postedDate' not in df.columns:
+        return None
+    newest = pd.to_datetime(df['postedDate'], errors='coerce', utc=True).max()
+    return None if pd.isna(newest) else newest.tz_convert(None).normalize()
+
+
+def merge_incremental(cached_df, new_df, window_start=None):
+    # New rows win over cached ones with the same noticeId
+    merged = pd.concat([new_df, cached_df], ignore_index=True)
+    if 'noticeId' in merged.columns:
+        merged = merged.drop_duplicates(subset='noticeId', keep='first')
+    if window_start is not None and 'postedDate' in merged.columns:
+        posted = pd.to_datetime(merged['postedDate'], errors='coerce', utc=True).dt.tz_convert(None)
+        merged = merged[posted.isna() | (posted >= window_start)]
+    return merged.reset_index(drop=True)
+
+
+class OpportunityCache:
+    def __init__(self, db_file=CACHE_DB_FILE, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.db_file = db_file
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                params TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                total_records INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def _bump(self, name):
+        self._conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        # Returns (df, total_records, is_fresh, fetched_at) or None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, total_records, fetched_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._bump('misses')
+                return None
+            payload, total_records, fetched_at = row
+            fresh = (time.time() - fetched_at) < self.ttl_seconds
+            self._bump('hits' if fresh else 'stale_hits')
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        records = zlib.decompress(payload).decode()
+        df = pd.read_json(io.StringIO(records), orient='records', dtype=False, convert_dates=False)
+        return df, total_records, fresh, fetched_at
+
+    def put(self, key, params, df, total_records):
+        # Returns the fetched_at timestamp recorded for the entry
+        payload = zlib.compress(df.to_json(orient='records', date_format='iso').encode())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, params, payload, size_bytes, total_records, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(params, sort_keys=True), payload, len(payload),
+                 int(total_records), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+        return now
+
+    def _evict(self):
+        # Drop least recently used entries until we fit in max_bytes
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size_bytes FROM entries ORDER BY accessed_at").fetchall()
+        for key, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size_bytes
+            self._bump('evictions')
+
+    def record_refresh(self):
+        with self._lock:
+            self._bump('incremental_refreshes')
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries"
+            ).fetchone()
+        counters.update(entries=entries, size_bytes=size_bytes)
+        return counters
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM stats")
+            self._conn.commit()
+
+
+def search_params(naics=None, agency=None, posted_from=None, opportunity_type=None, set_aside=None):
+    params = {
+        "postedFrom": posted_from.strftime("%m/%d/%Y"),
+        "postedTo": datetime.now().strftime("%m/%d/%Y")
+    }
+    if naics and naics.strip():
+        params["ncode"] = naics.strip()
+    if agency and agency.strip():
+        params["organizationName"] = agency.strip()
+    if opportunity_type:
+        params["type"] = opportunity_type
+    if set_aside:
+        params["typeOfSetAside"] = set_aside_code(set_aside)
+    return params
+
+
+def load_search(cache, api_key, naics=None, agency=None, date_range=30, opportunity_type=None,
+                on_page=None, max_age=None, allow_stale=False, set_aside=None, on_frame=None, cancel=None):
+    # Returns the raw (df, total_records, fetched_at) for a search, serving it
+    # from the cache when fresh and otherwise fetching only the days after the
+    # newest cached postedDate. max_age overrides the cache TTL; allow_stale
+    # returns whatever is cached without going to the network
+    cache_params = normalize_params(naics, agency, date_range, opportunity_type, set_aside)
+    cache_key = make_key(cache_params)
+    window_start = (datetime.now() - timedelta(days=date_range)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        df, total_records, fresh, fetched_at = cached
+        if max_age is not None:
+            fresh = (time.time() - fetched_at) < max_age
+        if fresh or allow_stale:
+            return df, total_records, fetched_at
+
+    params = search_params(naics, agency, window_start, opportunity_type, set_aside)
+    newest = newest_posted_date(cached[0]) if cached is not None else None
+    if newest is not None:
+        delta_params = dict(params, postedFrom=max(newest, window_start).strftime("%m/%d/%Y"))
+        new_df, _ = fetch_all(api_key, delta_params, on_page=on_page, cancel=cancel)
+        df = merge_incremental(cached[0], new_df, window_start)
+        # The delta's totalRecords only counts new postings; a one-record page
+        # over the whole window gives the API's figure
+        total_records = int(fetch_page(api_key, params, 0, 1, cancel=cancel).get("totalRecords", 0) or 0)
+        cache.record_refresh()
+    else:
+        # Only a full fetch streams frames: an incremental one only has the delta
+        df, total_records = fetch_all(api_key, params, on_page=on_page, on_frame=on_frame, cancel=cancel)
+
+    fetched_at = cache.put(cache_key, cache_params, df, total_records)
+    return df, total_records, fetched_at
@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# scrypt work factor; raise SCRYPT_N to make every hash more expensive.
+# Stored hashes made with other parameters are upgraded on the next login
+SCRYPT_N = int(os.environ.get('CAPTURE_SCRYPT_N', 2 ** 14))
+SCRYPT_R = int(os.environ.get('CAPTURE_SCRYPT_R', 8))
+SCRYPT_P = int(os.environ.get('CAPTURE_SCRYPT_P', 1))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+VERIFY_CACHE_TTL = 300  # seconds
+VERIFY_CACHE_SIZE = 1024
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * r * n, dklen=KEY_BYTES)
+
+
+def hash_password(password, n=None, r=None, p=None):
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def is_hashed(stored):
+    # False for plaintext left over from the pickle store
+    return stored.startswith('scrypt$')
+
+
+def _parse(stored):
+    # None for anything that isn't a well-formed scrypt record
+    parts = stored.split('$')
+    if len(parts) != 6 or parts[0] != 'scrypt':
+        return None
+    _, n, r, p, salt, key = parts
+    try:
+        return int(n), int(r), int(p), base64.b64decode(salt, validate=True), base64.b64decode(key, validate=True)
+    except ValueError:
+        return None
+
+
+def verify_password(password, stored):
+    # A malformed or unhashed record never verifies
+    parsed = _parse(stored)
+    if parsed is None:
+        return False
+    n, r, p, salt, key = parsed
+    try:
+        derived = _scrypt(password, salt, n, r, p)
+    except ValueError:
+        return False
+    return hmac.compare_digest(derived, key)
+
+
+def needs_rehash(stored):
+    parsed = _parse(stored)
+    return parsed is None or parsed[:3] != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+class VerificationCache:
+    # Remembers successful verifications per (session, username, stored hash)
+    # for a short time so reruns in the same session skip the KDF. Keys are
+    # HMACed with a per-process secret, so no password material is kept
+    def __init__(self, ttl=VERIFY_CACHE_TTL, max_entries=VERIFY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._secret = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, session_id, username, password, stored):
+        message = '\0'.join([session_id, username, password, stored]).encode()
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def check(self, session_id, username, password, stored):
+        key = self._key(session_id, username, password, stored)
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, session_id, username, password, stored):
+        key = self._key(session_id, username, password, stored)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+verification_cache = VerificationCache()
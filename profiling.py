@@ -0,0 +1,173 @@
+import cProfile
+import functools
+import io
+import marshal
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+RECENT_RERUNS = 200
+PROFILE_LINES = 40
+
+
+def _row_count(value):
+    if isinstance(value, (pd.DataFrame, np.ndarray)):
+        return len(value)
+    if isinstance(value, tuple):
+        for item in value:
+            if isinstance(item, (pd.DataFrame, np.ndarray)):
+                return len(item)
+    return None
+
+
+class Profiler:
+    # Per-rerun stage timings. Everything is a no-op unless enabled, so the
+    # decorated hot paths pay one attribute check when profiling is off.
+    # tracemalloc is process-wide: with several sessions rerunning at once,
+    # stage peaks include their allocations too
+    def __init__(self, enabled=False, trace_memory=False, maxlen=RECENT_RERUNS):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.reruns = deque(maxlen=maxlen)
+        self.last_profile = None
+        self._local = threading.local()
+
+    def configure(self, enabled, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def rerun(self, label=None, profile=False):
+        if not self.enabled or getattr(self._local, 'rerun', None) is not None:
+            yield
+            return
+
+        record = {'started_at': time.time(), 'label': label, 'stages': []}
+        self._local.rerun = record
+        self._local.stack = []
+        profiler = cProfile.Profile() if profile else None
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.last_profile = self._profile_report(profiler, label)
+            record['seconds'] = time.perf_counter() - start
+            self._local.rerun = None
+            self.reruns.append(record)
+
+    @contextmanager
+    def stage(self, name):
+        record = getattr(self._local, 'rerun', None)
+        if record is None:
+            yield {}
+            return
+
+        stack = self._local.stack
+        tracing = tracemalloc.is_tracing()
+        entry = {'name': name, 'rows': None, 'peak': 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            entry['base'] = current
+        stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            peak_bytes = None
+            if tracing and tracemalloc.is_tracing():
+                peak = max(entry['peak'], tracemalloc.get_traced_memory()[1])
+                peak_bytes = peak - entry['base']
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            record['stages'].append({
+                'stage': name,
+                'seconds': seconds,
+                'peak_bytes': peak_bytes,
+                'rows': entry['rows'],
+                'depth': len(stack),
+            })
+
+    def timed(self, name=None):
+        # Decorator form of stage(); row counts come from the first DataFrame
+        # or array returned, else the first one passed in
+        def decorator(fn):
+            stage_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.stage(stage_name) as entry:
+                    result = fn(*args, **kwargs)
+                    rows = _row_count(result)
+                    if rows is None:
+                        rows = next((r for r in map(_row_count, args) if r is not None), None)
+                    entry['rows'] = rows
+                    return result
+            return wrapper
+        return decorator
+
+    def _profile_report(self, profiler, label):
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(PROFILE_LINES)
+        # marshal of stats.stats is exactly what dump_stats() writes to a .prof file
+        return {'label': label, 'created_at': time.time(), 'text': out.getvalue(),
+                'pstats': marshal.dumps(stats.stats)}
+
+    def recent(self, limit=20):
+        return list(self.reruns)[-limit:][::-1]
+
+    def stage_stats(self):
+        # One row per stage: calls, p50/p95 wall time, worst peak allocation, last row count
+        rows = []
+        reruns = list(self.reruns)
+        for record in reruns:
+            rows.append({'stage': 'rerun', 'seconds': record['seconds'], 'peak_bytes': None, 'rows': None})
+            rows.extend(record['stages'])
+        if not rows:
+            return pd.DataFrame(columns=['stage', 'calls', 'p50_ms', 'p95_ms', 'peak_mb', 'rows'])
+        frame = pd.DataFrame(rows)
+        grouped = frame.groupby('stage', sort=False)
+        stats = pd.DataFrame({
+            'calls': grouped.size(),
+            'p50_ms': grouped['seconds'].quantile(0.5) * 1000,
+            'p95_ms': grouped['seconds'].quantile(0.95) * 1000,
+            'peak_mb': grouped['peak_bytes'].max() / 1024 / 1024,
+            'rows': grouped['rows'].last(),
+        })
+        return stats.sort_values('p95_ms', ascending=False).reset_index()
+
+    def clear(self):
+        self.reruns.clear()
+        self.last_profile = None
+
+
+profiler = Profiler(
+    enabled=os.environ.get('CAPTURE_PROFILE', '') not in ('', '0'),
+    trace_memory=os.environ.get('CAPTURE_PROFILE_MEMORY', '') not in ('', '0'),
+)
+if profiler.trace_memory:
+    tracemalloc.start()
+timed = profiler.timed
+stage = profiler.stage
@@ -0,0 +1,121 @@
+import pandas as pd
+
+from transforms import parse_dates, STANDARD_FIELDS, PROVENANCE_COLUMNS
+
+# The typed shape both SAM.gov results and mapped uploads are normalized
+# into before anything else sees them. Columns outside it are dropped
+RECORD_COLUMNS = {
+    'noticeId': 'text',
+    'title': 'text',
+    'solicitationNumber': 'text',
+    'type': 'category',
+    'fullParentPathName': 'category',
+    'naicsCode': 'category',
+    'typeOfSetAside': 'category',
+    'typeOfSetAsideDescription': 'category',
+    'active': 'category',
+    'postedDate': 'datetime',
+    'responseDeadLine': 'datetime',
+    'archiveDate': 'datetime',
+    'placeOfPerformance': 'category',  # "City, ST 12345", the form uploads already use
+    'award': 'float',
+    'uiLink': 'text',
+    'description': 'text',
+}
+# Always present, even when the source has no such column
+REQUIRED_COLUMNS = list(STANDARD_FIELDS) + ['uiLink']
+CONTACT_COLUMNS = ['noticeId', 'type', 'fullName', 'title', 'email', 'phone']
+
+
+def _memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def _text(series):
+    if series.dtype == object:
+        return series.astype(str).where(series.notna(), None)
+    return series
+
+
+def _category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    # NAICS read from a CSV arrives as numbers
+    return _text(series).astype('category')
+
+
+def _place_text(value):
+    # SAM.gov sends {"city": {"name": ...}, "state": {"code": ...}, "zip": ...}
+    if not isinstance(value, dict):
+        return value
+    city = value.get('city')
+    city = city.get('name') if isinstance(city, dict) else city
+    state = value.get('state')
+    state = (state.get('code') or state.get('name')) if isinstance(state, dict) else state
+    zip_code = value.get('zip')
+    text = ", ".join(part for part in (city, state) if part)
+    if zip_code:
+        text = f"{text} {zip_code}" if text else str(zip_code)
+    return text or None
+
+
+def _award_amount(value):
+    return value.get('amount') if isinstance(value, dict) else value
+
+
+CONVERTERS = {
+    'text': _text,
+    'category': _category,
+    'datetime': parse_dates,
+    'float': lambda series: pd.to_numeric(series, errors='coerce').astype('float64'),
+}
+
+
+def contacts_table(df):
+    # One row per point of contact, keyed back to the record by noticeId
+    if 'pointOfContact' not in df.columns or 'noticeId' not in df.columns:
+        return pd.DataFrame(columns=CONTACT_COLUMNS)
+    exploded = df[['noticeId', 'pointOfContact']].explode('pointOfContact', ignore_index=True)
+    exploded = exploded[exploded['pointOfContact'].map(lambda c: isinstance(c, dict))]
+    if exploded.empty:
+        return pd.DataFrame(columns=CONTACT_COLUMNS)
+    details = pd.DataFrame(exploded['pointOfContact'].tolist())
+    contacts = pd.DataFrame({'noticeId': exploded['noticeId'].to_numpy()})
+    for column in CONTACT_COLUMNS[1:]:
+        contacts[column] = details[column].to_numpy() if column in details.columns else None
+    contacts['type'] = _category(contacts['type'])
+    return contacts
+
+
+def to_records(df):
+    # Returns (records, contacts, stats): the typed frame, the side table of
+    # points of contact and the memory each took before and after
+    before_mb = _memory_mb(df)
+    columns = {}
+    for column, kind in RECORD_COLUMNS.items():
+        if column not in df.columns:
+            if column in REQUIRED_COLUMNS:
+                columns[column] = pd.Series(None, index=df.index, dtype=object)
+            else:
+                continue
+        else:
+            columns[column] = df[column]
+        series = columns[column]
+        if column == 'placeOfPerformance' and series.dtype == object:
+            series = series.map(_place_text)
+        elif column == 'award' and series.dtype == object:
+            series = series.map(_award_amount)
+        columns[column] = CONVERTERS[kind](series)
+    for column in PROVENANCE_COLUMNS:
+        if column in df.columns:
+            columns[column] = _category(df[column])
+
+    records = pd.DataFrame(columns, index=df.index)
+    contacts = contacts_table(df)
+    stats = {
+        'before_mb': before_mb,
+        'after_mb': _memory_mb(records),
+        'contacts_mb': _memory_mb(contacts),
+        'contacts': len(contacts),
+    }
+    return records, contacts, stats
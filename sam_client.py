@@ -0,0 +1,148 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+# Overridable so the app can be pointed at a local mock server
+SAM_SEARCH_URL = os.environ.get('SAM_SEARCH_URL', "https://api.sam.gov/opportunities/v2/search")
+
+PAGE_SIZE = 1000          # SAM.gov caps `limit` at 1000 per request
+MAX_WORKERS = 4           # worker threads per search
+MAX_IN_FLIGHT = 8         # requests in flight across every search in this process
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5        # seconds, doubled on every retry
+REQUEST_TIMEOUT = (5, 30) # (connect, read) seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+
+class FetchCancelled(Exception):
+    pass
+
+
+class SamApiError(Exception):
+    def __init__(self, status_code, text):
+        super().__init__(f"API Error: {status_code}")
+        self.status_code = status_code
+        self.text = text
+
+
+def get_session():
+    # One pooled session shared by every worker thread and every rerun
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_IN_FLIGHT)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return BACKOFF_BASE * (2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+
+def _check_cancelled(cancel):
+    if cancel is not None and cancel.is_set():
+        raise FetchCancelled()
+
+
+def fetch_page(api_key, params, offset, limit=PAGE_SIZE, base_url=None, cancel=None):
+    # cancel: optional threading.Event; once set, no new attempt or backoff
+    # wait starts, and requests already sent finish within REQUEST_TIMEOUT
+    headers = {
+        "X-Api-Key": api_key,
+        "Accept": "application/json"
+    }
+    page_params = dict(params, offset=offset, limit=limit)
+    base_url = base_url or SAM_SEARCH_URL
+    session = get_session()
+
+    for attempt in range(MAX_RETRIES + 1):
+        _check_cancelled(cancel)
+        response = None
+        try:
+            with _in_flight:
+                response = session.get(base_url, headers=headers, params=page_params,
+                                       timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                raise SamApiError(response.status_code, response.text)
+        delay = _retry_delay(response, attempt)
+        if cancel is None:
+            time.sleep(delay)
+        elif cancel.wait(delay):
+            raise FetchCancelled()
+
+
+def iter_pages(api_key, params, page_size=PAGE_SIZE, max_workers=MAX_WORKERS,
+               base_url=None, cancel=None):
+    # The first page tells us totalRecords; the remaining offsets are fetched
+    # concurrently and yielded in completion order as (offset, payload)
+    first = fetch_page(api_key, params, 0, page_size, base_url, cancel)
+    yield 0, first
+
+    total = int(first.get("totalRecords", 0) or 0)
+    offsets = list(range(page_size, total, page_size))
+    if not offsets:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_page, api_key, params, offset, page_size, base_url, cancel): offset
+            for offset in offsets
+        }
+        try:
+            for future in as_completed(futures):
+                _check_cancelled(cancel)
+                yield futures[future], future.result()
+        finally:
+            # Queued pages are dropped; leaving the executor waits for the
+            # ones in flight, so nothing outlives the search
+            for future in futures:
+                future.cancel()
+
+
+def fetch_all(api_key, params, page_size=PAGE_SIZE, max_workers=MAX_WORKERS,
+              base_url=None, on_page=None, on_frame=None, cancel=None):
+    # on_frame(offset, frame, total) sees each page's records as it arrives
+    frames = {}
+    total = 0
+    pages_expected = 1
+
+    for offset, payload in iter_pages(api_key, params, page_size, max_workers, base_url, cancel):
+        if offset == 0:
+            total = int(payload.get("totalRecords", 0) or 0)
+            pages_expected = max(1, -(-total // page_size))
+        frames[offset] = pd.DataFrame(payload.get("opportunitiesData", []))
+        if on_frame is not None:
+            on_frame(offset, frames[offset], total)
+        if on_page is not None:
+            on_page(len(frames), pages_expected, sum(len(f) for f in frames.values()))
+
+    df = pd.concat([frames[offset] for offset in sorted(frames)], ignore_index=True)
+    if "noticeId" in df.columns:
+        # Records can shift between pages while we paginate; keep the first copy
+        df = df.drop_duplicates(subset="noticeId", keep="first").reset_index(drop=True)
+    return df, total
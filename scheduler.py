@@ -0,0 +1,88 @@
+import logging
+import os
+import threading
+import time
+
+from opportunity_cache import load_search, make_key, normalize_params
+
+SYNC_INTERVAL = int(os.environ.get('CAPTURE_SYNC_INTERVAL', 30 * 60))  # seconds
+
+logger = logging.getLogger(__name__)
+
+
+class SyncScheduler:
+    # Background thread that keeps every user's saved searches fresh in the
+    # local opportunity cache. API keys are only held in memory: a user's key
+    # is registered when they search or save, with SAM_API_KEY as a fallback
+    def __init__(self, user_store, cache, interval=SYNC_INTERVAL, on_refresh=None):
+        self.user_store = user_store
+        self.cache = cache
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self.last_run = None
+        self._errors = {}  # (username, saved search name) -> message, guarded by _lock
+        self._fetched_at = {}
+        self._api_keys = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="saved-search-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def register_api_key(self, username, api_key):
+        if username and api_key:
+            with self._lock:
+                self._api_keys[username] = api_key
+
+    def _api_key(self, username):
+        with self._lock:
+            return self._api_keys.get(username) or os.environ.get('SAM_API_KEY')
+
+    def last_errors(self, username):
+        # {saved search name: message} from the last sync, copied under the lock
+        with self._lock:
+            return {name: error for (user, name), error in self._errors.items() if user == username}
+
+    def run_now(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync_all()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def sync_all(self):
+        # Saved searches shared by several users are refreshed once
+        done = set()
+        for username, name, filters in self.user_store.all_filters():
+            params = normalize_params(filters.get('naics'), filters.get('agency'),
+                                      filters.get('date_range', 30), filters.get('type'),
+                                      filters.get('set_aside'))
+            key = make_key(params)
+            api_key = self._api_key(username)
+            if key in done or not api_key:
+                continue
+            try:
+                _, _, fetched_at = load_search(self.cache, api_key, filters.get('naics'), filters.get('agency'),
+                                               filters.get('date_range', 30), filters.get('type'),
+                                               max_age=self.interval, set_aside=filters.get('set_aside'))
+                done.add(key)
+                with self._lock:
+                    self._errors.pop((username, name), None)
+                if fetched_at != self._fetched_at.get(key):
+                    self._fetched_at[key] = fetched_at
+                    if self.on_refresh is not None:
+                        self.on_refresh(key)
+            except Exception as e:
+                with self._lock:
+                    self._errors[(username, name)] = str(e)
+                logger.warning("Saved search sync failed for %s/%s: %s", username, name, e)
+        self.last_run = time.time()
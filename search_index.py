@@ -0,0 +1,169 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# SAM.gov's description field is a link to the notice text, not the text
+# itself, so it would match 'sam', 'gov' and 'api' in every record
+TEXT_COLUMNS = ['title', 'fullParentPathName', 'naicsCode']
+FACET_COLUMNS = {
+    'type': ['type'],
+    'set_aside': ['typeOfSetAsideDescription', 'typeOfSetAside', 'setAside'],
+    'agency': ['fullParentPathName'],
+    'naics': ['naicsCode'],
+}
+TOKEN_PATTERN = r'[a-z0-9]+'
+EMPTY = np.array([], dtype=np.int64)
+
+
+def tokenize(text):
+    return re.findall(TOKEN_PATTERN, text.lower())
+
+
+def _first_column(df, candidates):
+    for column in candidates:
+        if column in df.columns:
+            return column
+    return None
+
+
+def document_keys(df):
+    # noticeId for SAM.gov records; uploads fall back to their row labels
+    if 'noticeId' in df.columns:
+        return df['noticeId'].astype(str)
+    return pd.Series(df.index.astype(str), index=df.index)
+
+
+def content_hashes(df):
+    # One hash per row over everything the index reads, to spot changed records
+    columns = [c for c in dict.fromkeys(TEXT_COLUMNS + sum(FACET_COLUMNS.values(), [])) if c in df.columns]
+    if not columns:
+        return np.zeros(len(df), dtype=np.uint64)
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+class SearchIndex:
+    # Inverted index over one dataset. Documents are numbered in the order
+    # they are first seen; update() only tokenizes records it hasn't seen
+    # yet or whose indexed fields changed, so an incremental refresh costs
+    # time proportional to the new and changed rows. A changed record's old
+    # document is retired rather than removed from every posting list, and
+    # the index is rebuilt once retired documents outnumber live ones
+    def __init__(self):
+        self._reset()
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        self.version = None
+        self._postings = {}
+        self._doc_keys = pd.Index([], dtype=object)  # doc id -> key, retired ones included
+        self._live = pd.Series([], dtype=np.int64, index=pd.Index([], dtype=object))  # key -> doc id
+        self._hashes = np.array([], dtype=np.uint64)  # doc id -> content hash
+        self._docs = pd.DataFrame()
+        self._positions = EMPTY  # doc id -> row position in the current frame, -1 if gone
+        self._all_facets = None
+
+    def __len__(self):
+        return len(self._live)
+
+    def update(self, df, version=None):
+        with self._lock:
+            if version is not None and version == self.version:
+                return 0
+            if 'noticeId' not in df.columns:
+                # Row labels say nothing about content: a remapped or edited
+                # upload keeps them, so a new version is indexed from scratch
+                self._reset()
+            keys = document_keys(df)
+            first = ~keys.duplicated().to_numpy()
+            hashes = content_hashes(df)
+
+            found = self._live.index.get_indexer(keys)
+            doc_ids = np.full(len(keys), -1, dtype=np.int64)
+            doc_ids[found >= 0] = self._live.to_numpy()[found[found >= 0]]
+            changed = first & (doc_ids >= 0)
+            changed[changed] = self._hashes[doc_ids[changed]] != hashes[changed]
+            if changed.any():
+                self._live = self._live.drop(keys[changed])
+            if len(self._doc_keys) - len(self._live) > len(self._live):
+                self._reset()
+                doc_ids[:] = -1
+            is_new = first & ((doc_ids < 0) | changed)
+
+            new = df[is_new]
+            if len(new):
+                self._add(new, keys[is_new], hashes[is_new])
+
+            # Row of each live document's key in this frame, first copy wins
+            found = pd.Index(keys.to_numpy()[first]).get_indexer(self._live.index)
+            self._positions = np.full(len(self._doc_keys), -1, dtype=np.int64)
+            self._positions[self._live.to_numpy()[found >= 0]] = np.flatnonzero(first)[found[found >= 0]]
+            self._all_facets = None
+            self.version = version
+            return len(new)
+
+    def _add(self, new, new_keys, hashes):
+        first_id = len(self._doc_keys)
+        doc_ids = np.arange(first_id, first_id + len(new), dtype=np.int64)
+
+        text_columns = [c for c in TEXT_COLUMNS if c in new.columns]
+        if text_columns:
+            parts = [new[c].astype(str).where(new[c].notna(), '') for c in text_columns]
+            text = parts[0].str.cat(parts[1:], sep=' ') if len(parts) > 1 else parts[0]
+            pairs = (pd.DataFrame({'doc': doc_ids, 'token': text.str.lower().str.findall(TOKEN_PATTERN).to_numpy()})
+                       .explode('token')
+                       .dropna()
+                       .drop_duplicates())
+            for token, docs in pairs.groupby('token', sort=False)['doc']:
+                existing = self._postings.get(token)
+                docs = docs.to_numpy(dtype=np.int64)
+                self._postings[token] = docs if existing is None else np.concatenate([existing, docs])
+
+        columns = {}
+        for name, candidates in FACET_COLUMNS.items():
+            column = _first_column(new, candidates)
+            values = new[column] if column else pd.Series(None, index=new.index, dtype=object)
+            columns[name] = values.astype(str).where(values.notna(), 'N/A').to_numpy()
+        docs = pd.DataFrame(columns, index=doc_ids)
+
+        self._docs = docs if self._docs.empty else pd.concat([self._docs, docs])
+        self._doc_keys = self._doc_keys.append(pd.Index(new_keys.to_numpy(), dtype=object))
+        self._live = pd.concat([self._live, pd.Series(doc_ids, index=pd.Index(new_keys.to_numpy(), dtype=object))])
+        self._hashes = np.concatenate([self._hashes, hashes])
+
+    def _facets(self, candidates):
+        return {
+            name: pd.Series(self._docs[name].to_numpy()[candidates]).value_counts()
+            for name in FACET_COLUMNS
+        }
+
+    def search(self, query='', filters=None):
+        # Returns (row positions in the current frame, unordered,
+        # {facet: counts Series})
+        with self._lock:
+            candidates = np.flatnonzero(self._positions >= 0)
+
+            tokens = tokenize(query) if query else []
+            if tokens:
+                postings = sorted((self._postings.get(t, EMPTY) for t in set(tokens)), key=len)
+                for docs in postings:
+                    candidates = np.intersect1d(candidates, docs, assume_unique=True)
+                    if not len(candidates):
+                        break
+
+            # Facet counts reflect the keyword match only, so the facet choices
+            # stay put while the user ticks them
+            if tokens:
+                facets = self._facets(candidates)
+            else:
+                if self._all_facets is None:
+                    self._all_facets = self._facets(candidates)
+                facets = self._all_facets
+
+            for name, values in (filters or {}).items():
+                if values:
+                    mask = self._docs[name].to_numpy()[candidates]
+                    candidates = candidates[np.isin(mask, list(values))]
+
+            return self._positions[candidates], facets
@@ -0,0 +1,119 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import deque
+
+SESSION_TTL = 8 * 60 * 60  # seconds
+EVICT_INTERVAL = 60        # seconds between sweeps for expired sessions
+LATENCY_SAMPLES = 1000
+
+
+class SessionStore:
+    # Sessions live in this process only, and a browser holds its token in
+    # st.session_state, so a session lasts as long as its websocket: a reload
+    # or a server restart means logging in again
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._secret = secrets.token_bytes(32)
+
+    def _sign(self, session_id, expires_at):
+        message = f"{session_id}.{int(expires_at)}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def create(self, username):
+        now = time.time()
+        session_id = secrets.token_urlsafe(18)
+        expires_at = int(now + self.ttl)
+        session = {
+            'session_id': session_id,
+            'username': username,
+            'created_at': now,
+            'expires_at': expires_at,
+            'last_seen': now,
+        }
+        with self._lock:
+            self._sessions[session_id] = session
+        return f"{session_id}.{expires_at}.{self._sign(session_id, expires_at)}"
+
+    def validate(self, token):
+        # Pure in-memory check: signature, expiry, then revocation
+        try:
+            session_id, expires_at, signature = token.split('.')
+            expires_at = int(expires_at)
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(session_id, expires_at)):
+            return None
+
+        now = time.time()
+        if expires_at < now:
+            self.revoke(session_id)
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session['last_seen'] = now
+        self._sweep(now)
+        return session
+
+    def revoke(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def revoke_user(self, username):
+        # Every session of one user, e.g. after their password is reset
+        with self._lock:
+            revoked = [sid for sid, s in self._sessions.items() if s['username'] == username]
+            for session_id in revoked:
+                del self._sessions[session_id]
+        return len(revoked)
+
+    def revoke_token(self, token):
+        if token:
+            self.revoke(token.split('.')[0])
+
+    def _sweep(self, now):
+        if now < self._next_sweep:
+            return
+        with self._lock:
+            self._next_sweep = now + EVICT_INTERVAL
+            expired = [sid for sid, s in self._sessions.items() if s['expires_at'] < now]
+            for session_id in expired:
+                del self._sessions[session_id]
+
+    def active(self):
+        now = time.time()
+        with self._lock:
+            return [dict(s) for s in self._sessions.values() if s['expires_at'] >= now]
+
+    def record_latency(self, seconds, path):
+        self._latencies.append((path, seconds))
+
+    def latency_stats(self):
+        # {path: (samples, p50 ms, p95 ms)} over the most recent reruns
+        by_path = {}
+        for path, seconds in list(self._latencies):
+            by_path.setdefault(path, []).append(seconds * 1000)
+        stats = {}
+        for path, values in by_path.items():
+            values.sort()
+            stats[path] = (len(values), values[len(values) // 2], values[min(len(values) - 1, int(len(values) * 0.95))])
+        return stats
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+        return _store
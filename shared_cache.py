@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def frame_bytes(value):
+    # Results are (df, total_records) tuples; size them by the frame
+    df = value[0] if isinstance(value, tuple) else value
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except AttributeError:
+        return 0
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.abandoned = False
+
+
+class SharedResultCache:
+    # Process-wide LRU shared by every session. Concurrent requests for the
+    # same key are coalesced: the first caller computes, the rest wait on it
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, sizeof=frame_bytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, size, cost, expires_at)
+        self._flights = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'loads': 0,
+            'requests_saved': 0,
+        }
+
+    def peek(self, key):
+        # Like get, but not counted in the stats
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get(self, key):
+        # The cached value, or None without counting a miss
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def get_or_compute(self, key, compute, ttl, cost=None, interrupts=()):
+        # compute() returns the value; cost(value) is how many upstream API
+        # requests producing it took, credited as saved to every caller that
+        # joined the computation instead of starting its own. None values are
+        # returned to every waiter but never cached. Errors are passed on to
+        # the waiters, but not BaseExceptions or the interrupts types: those
+        # stop only the caller that raised them and a waiter computes instead
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[3] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[0]
+
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self._stats['misses'] += 1
+                else:
+                    self._stats['coalesced'] += 1
+
+            if leader:
+                break
+            flight.done.wait()
+            if flight.abandoned:
+                # The leader was interrupted (a rerun, a cancelled job), which
+                # says nothing about this caller's request
+                continue
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._stats['requests_saved'] += entry[2]
+            return flight.value
+
+        try:
+            value = compute()
+            flight.value = value
+        except interrupts:
+            flight.abandoned = True
+            raise
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            flight.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.error is None and not flight.abandoned and flight.value is not None:
+                    self._stats['loads'] += 1
+                    self._store(key, flight.value, cost(flight.value) if cost else 1, ttl)
+            flight.done.set()
+        return value
+
+    def _store(self, key, value, cost, ttl):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size, cost, time.monotonic() + ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size, _, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats['evictions'] += 1
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[1]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = (stats['hits'] + stats['coalesced']) / lookups if lookups else 0.0
+        return stats
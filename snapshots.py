@@ -0,0 +1,235 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+SNAPSHOT_DIR = 'snapshots'
+MAX_SNAPSHOTS_PER_SOURCE = 10
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+KEY_COLUMNS = ['noticeId', 'title']
+# Derived from the clock, the upload or the app rather than the record itself,
+# so they would mark every row as changed
+IGNORED_COLUMNS = ['days_remaining', 'uiLink', 'source_file', 'source_sheet']
+KEY = '_key'
+ROW_HASH = '_row_hash'
+
+
+def key_column(columns):
+    return next((c for c in KEY_COLUMNS if c in columns), None)
+
+
+def _flatten(df):
+    # Nested API fields (place of performance, contacts) are stored as JSON
+    # text so Arrow can write them and they hash the same way every time
+    for column in df.columns:
+        series = df[column]
+        if series.dtype != object or pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            continue
+        series = series.map(lambda v: json.dumps(v, sort_keys=True, default=str)
+                            if isinstance(v, (dict, list)) else v)
+        if pd.api.types.infer_dtype(series, skipna=True).startswith('mixed'):
+            series = series.astype(str).where(series.notna(), None)
+        df[column] = series
+    return df
+
+
+def snapshot_frame(df):
+    # One row per key with a 64-bit hash of its content columns. Columns an
+    # upload mapping filled with placeholders (df.attrs['filled_columns'],
+    # e.g. today's date for an unmapped postedDate) are left out entirely
+    ignored = IGNORED_COLUMNS + list(df.attrs.get('filled_columns', ()))
+    content = [c for c in df.columns if c not in ignored]
+    key = key_column(content)
+    if key is None:
+        raise ValueError("Snapshots need a noticeId or title column")
+    frame = _flatten(df[content].copy())
+    frame[KEY] = frame[key].astype(str)
+    frame = frame[frame[key].notna()].drop_duplicates(subset=KEY, keep='last')
+    frame[ROW_HASH] = pd.util.hash_pandas_object(frame[content], index=False).to_numpy()
+    return frame.reset_index(drop=True), key
+
+
+class SnapshotStore:
+    # Successive results of the same search or upload series, each kept as
+    # an uncompressed Feather file. Only the newest few per source are kept,
+    # and least recently used snapshots of any source go once the store is
+    # over max_bytes
+    def __init__(self, root=SNAPSHOT_DIR, max_per_source=MAX_SNAPSHOTS_PER_SOURCE, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_per_source = max_per_source
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                version TEXT NOT NULL,
+                key_column TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                accessed_at REAL NOT NULL DEFAULT 0,
+                UNIQUE (source, version)
+            )
+        """)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(snapshots)")}
+        for column, definition in (('size_bytes', 'INTEGER NOT NULL DEFAULT 0'),
+                                   ('accessed_at', 'REAL NOT NULL DEFAULT 0')):
+            if column not in existing:
+                # Indexes written before the byte budget; sizes are filled in below
+                self._conn.execute(f"ALTER TABLE snapshots ADD COLUMN {column} {definition}")
+        for (snapshot_id,) in self._conn.execute("SELECT id FROM snapshots WHERE size_bytes = 0").fetchall():
+            if os.path.exists(self.path(snapshot_id)):
+                self._conn.execute("UPDATE snapshots SET size_bytes = ? WHERE id = ?",
+                                   (os.path.getsize(self.path(snapshot_id)), snapshot_id))
+        self._conn.commit()
+
+    def path(self, snapshot_id):
+        return os.path.join(self.root, f"{snapshot_id}.feather")
+
+    def has_version(self, source, version):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM snapshots WHERE source = ? AND version = ?",
+                                     (source, version)).fetchone()
+        return row is not None
+
+    def record(self, source, df, version):
+        # Idempotent per (source, version), so it can be called on every rerun
+        if self.has_version(source, version):
+            return None
+        frame, key = snapshot_frame(df)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO snapshots (source, version, key_column, rows, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source, version, key, len(frame), time.time())
+            )
+            self._conn.commit()
+            if not cursor.rowcount:
+                return None
+            snapshot_id = cursor.lastrowid
+        path = self.path(snapshot_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        feather.write_feather(frame, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._conn.execute("UPDATE snapshots SET size_bytes = ?, accessed_at = ? WHERE id = ?",
+                               (os.path.getsize(path), time.time(), snapshot_id))
+            self._conn.commit()
+        self._prune(source)
+        self._evict(keep=snapshot_id)
+        return snapshot_id
+
+    def _prune(self, source):
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT id FROM snapshots WHERE source = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+                (source, self.max_per_source)
+            ).fetchall()
+            for (snapshot_id,) in old:
+                self._remove(snapshot_id)
+            self._conn.commit()
+
+    def _evict(self, keep=None):
+        # Least recently used snapshots go first once the store is over budget
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM snapshots").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute("SELECT id, size_bytes FROM snapshots ORDER BY accessed_at").fetchall()
+            for snapshot_id, size_bytes in rows:
+                if total <= self.max_bytes:
+                    break
+                if snapshot_id == keep:
+                    continue
+                self._remove(snapshot_id)
+                total -= size_bytes
+            self._conn.commit()
+
+    def _remove(self, snapshot_id):
+        self._conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+        try:
+            os.remove(self.path(snapshot_id))
+        except FileNotFoundError:
+            pass
+
+    def _touch(self, snapshot_id):
+        with self._lock:
+            self._conn.execute("UPDATE snapshots SET accessed_at = ? WHERE id = ?", (time.time(), snapshot_id))
+            self._conn.commit()
+
+    def list(self, source):
+        # Newest first
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT id, version, key_column, rows, created_at FROM snapshots "
+                "WHERE source = ? ORDER BY id DESC",
+                self._conn, params=(source,)
+            )
+        df['created_at'] = pd.to_datetime(df['created_at'], unit='s')
+        # A snapshot being written by another session isn't readable yet
+        return df[[os.path.exists(self.path(i)) for i in df['id']]].reset_index(drop=True)
+
+    def load(self, snapshot_id, columns=None):
+        self._touch(snapshot_id)
+        return feather.read_feather(self.path(snapshot_id), columns=columns, memory_map=True)
+
+    def rows(self, snapshot_id, keys):
+        # Only the requested records are converted to pandas
+        self._touch(snapshot_id)
+        table = feather.read_table(self.path(snapshot_id), memory_map=True)
+        table = table.filter(pc.is_in(table[KEY], value_set=pa.array(list(keys), type=pa.string())))
+        return table.to_pandas().set_index(KEY)
+
+    def diff(self, old_id, new_id):
+        # Hash join on the record key: keys on one side only were added or
+        # removed, keys on both sides with different hashes were modified
+        old = self.load(old_id, [KEY, ROW_HASH])
+        new = self.load(new_id, [KEY, ROW_HASH])
+        joined = old.merge(new, on=KEY, how='outer', suffixes=('_old', '_new'), indicator=True)
+        side = joined['_merge']
+        both = (side == 'both').to_numpy()
+        modified = both & (joined[f'{ROW_HASH}_old'] != joined[f'{ROW_HASH}_new']).to_numpy()
+        return {
+            'added': joined.loc[(side == 'right_only').to_numpy(), KEY].to_numpy(),
+            'removed': joined.loc[(side == 'left_only').to_numpy(), KEY].to_numpy(),
+            'modified': joined.loc[modified, KEY].to_numpy(),
+            'unchanged': int(both.sum() - modified.sum()),
+        }
+
+    def field_changes(self, old_id, new_id, keys):
+        # Long form (key, field, before, after) for the given modified records
+        before = self.rows(old_id, keys)
+        after = self.rows(new_id, keys)
+        keys = [k for k in keys if k in before.index and k in after.index]
+        fields = [c for c in after.columns if c != ROW_HASH]
+        fields += [c for c in before.columns if c != ROW_HASH and c not in fields]
+        changes = []
+        for field in fields:
+            old = before[field].reindex(keys).astype(object) if field in before.columns \
+                else pd.Series(None, index=keys, dtype=object)
+            new = after[field].reindex(keys).astype(object) if field in after.columns \
+                else pd.Series(None, index=keys, dtype=object)
+            same = (old == new) | (old.isna() & new.isna())
+            changed = ~same.to_numpy(dtype=bool)
+            if changed.any():
+                changes.append(pd.DataFrame({
+                    'key': np.asarray(keys, dtype=object)[changed],
+                    'field': field,
+                    'before': old[changed].to_numpy(),
+                    'after': new[changed].to_numpy(),
+                }))
+        if not changes:
+            return pd.DataFrame(columns=['key', 'field', 'before', 'after'])
+        order = {k: i for i, k in enumerate(keys)}
+        result = pd.concat(changes, ignore_index=True)
+        return result.sort_values('key', key=lambda s: s.map(order), kind='stable').reset_index(drop=True)
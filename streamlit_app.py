@@ -1,10 +1,31 @@
 import streamlit as st
-from auth import login_page, logout
-import requests
+from auth import login_page, logout, session_admin_panel, current_session_id
+from sam_client import SamApiError, FetchCancelled, PAGE_SIZE
+from shared_cache import SharedResultCache
+from fetch_jobs import FetchJob, FetchJobRegistry
+from scheduler import SyncScheduler
+from user_store import get_user_store
+from search_index import SearchIndex
+from views import DatasetView, SORT_KEYS
+from export import ExportCache, EXPORT_FORMATS
+from profiling import profiler, timed, stage
+from transforms import (normalize_dates, STANDARD_FIELDS, mapping_spec, spec_columns, filled_fields,
+                        apply_mapping, load_saved_mapping, save_mapping, schema_fingerprint, PROVENANCE_COLUMNS)
+from ingest import file_kind, ingest, sheet_names
+from batch_ingest import ingest_batch
+from dataset_store import DatasetStore, content_hash
+from snapshots import SnapshotStore, ROW_HASH
+from records import to_records
+from aggregations import compute_rollups
+from geo import aggregate_by_state, choropleth_figure
+from timeline import (timeline_rows, lane_density, density_figure, drilldown_figure, LANE_COLUMNS, BUCKETS,
+                      DEFAULT_MAX_BARS)
+from opportunity_cache import OpportunityCache, normalize_params, make_key, load_search, set_aside_code
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.express as px
 import json
+import hashlib
 import openpyxl
 import io
 
@@ -66,114 +87,385 @@ def format_currency(value):
     except:
         return "N/A"
 
-def calculate_days_remaining(deadline):
-    try:
-        deadline_date = pd.to_datetime(deadline)
-        days = (deadline_date - pd.Timestamp.now()).days
-        return max(days, 0)
-    except:
-        return None
+@st.cache_resource
+def get_opportunity_cache():
+    return OpportunityCache()
 
-def fetch_opportunities(api_key, naics=None, agency=None, date_range=30, opportunity_type=None):
-    base_url = "https://api.sam.gov/opportunities/v2/search"
-    
-    headers = {
-        "X-Api-Key": api_key,
-        "Accept": "application/json"
-    }
-    
-    params = {
-        "postedFrom": (datetime.now() - timedelta(days=date_range)).strftime("%m/%d/%Y"),
-        "postedTo": datetime.now().strftime("%m/%d/%Y"),
-        "limit": 100
-    }
+@st.cache_resource
+def get_shared_results():
+    return SharedResultCache()
+
+@st.cache_resource
+def get_fetch_jobs():
+    return FetchJobRegistry()
+
+FIRST_PAGE_WAIT = 0.5        # seconds a rerun waits for the first page before rendering progress
+PROGRESS_POLL_SECONDS = 0.5
+
+@timed("fetch_opportunities")
+def fetch_opportunities(api_key, naics=None, agency=None, date_range=30, opportunity_type=None,
+                        allow_stale=False, set_aside=None):
+    # Returns (df, total_records, contacts) when the search is complete, otherwise the
+    # FetchJob loading it on a background thread. Identical searches from any
+    # session share one job and one cached result; the frame is shared, so
+    # callers must not modify it in place. Like the disk cache, results are
+    # keyed on the search alone: opportunities are public and the same under
+    # every valid API key, which only authorizes the upstream call
+    cache_key = make_key(normalize_params(naics, agency, date_range, opportunity_type, set_aside))
+    shared = get_shared_results()
+    job = st.session_state.get('fetch_job')
+    held = st.session_state.get('search_result')
+    if held is not None and held[0] == cache_key and shared.peek(cache_key) is held[1]:
+        # Later reruns of the same search; only the first lookup counts as a hit
+        return held[1]
+    result = shared.get(cache_key)
+    if result is not None:
+        if job is not None:
+            release_fetch_job()
+        st.session_state['search_result'] = (cache_key, result)
+        return result
+
+    if job is None or job.key != cache_key or job.state == 'cancelled':
+        # A cancelled job has nothing to show; start the search over
+        release_fetch_job()
+        cache = get_opportunity_cache()
+
+        def compute(job):
+            return shared.get_or_compute(
+                cache_key,
+                lambda: load_opportunities(cache, api_key, naics, agency, date_range, opportunity_type,
+                                           allow_stale, set_aside, on_frame=job.add_page, cancel=job.cancelled),
+                ttl=cache.ttl_seconds,
+                cost=lambda result: max(1, -(-result[1] // PAGE_SIZE)),
+                interrupts=(FetchCancelled,)
+            )
+
+        job = get_fetch_jobs().acquire(cache_key, current_session_id(), compute)
+        st.session_state['fetch_job'] = job
+        job.wait(FIRST_PAGE_WAIT)
+
+    if job.state == 'done':
+        st.session_state['search_result'] = (cache_key, job.result)
+        return job.result
+    return job
+
+def release_fetch_job():
+    # Stops watching this session's search; it is cancelled if nobody else is
+    job = st.session_state.pop('fetch_job', None)
+    if job is not None:
+        get_fetch_jobs().release(job, current_session_id())
+
+def load_opportunities(cache, api_key, naics=None, agency=None, date_range=30, opportunity_type=None,
+                       allow_stale=False, set_aside=None, on_frame=None, cancel=None):
+    # Runs on a fetch job's thread, so it must not call Streamlit
+    cache_key = make_key(normalize_params(naics, agency, date_range, opportunity_type, set_aside))
+    df, total_records, fetched_at = load_search(
+        cache, api_key, naics, agency, date_range, opportunity_type,
+        allow_stale=allow_stale, set_aside=set_aside, on_frame=on_frame, cancel=cancel
+    )
+    records, contacts, stats = to_records(df)
+    records.attrs['dataset_version'] = f"{cache_key}:{fetched_at}"
+    records.attrs['record_memory'] = stats
+    return normalize_dates(records), total_records, contacts
+
+@st.fragment(run_every=PROGRESS_POLL_SECONDS)
+def render_fetch_progress(job):
+    # Reruns on its own while the job is loading; a full rerun takes over
+    # as soon as the job has finished
+    if job.state != 'running':
+        st.rerun()
+
+    pages_done, pages_expected, rows_loaded = job.progress()
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        if pages_expected:
+            st.progress(min(pages_done / pages_expected, 1.0),
+                        text=f"Loaded {rows_loaded} records ({pages_done}/{pages_expected} pages)")
+        else:
+            st.progress(0.0, text="Fetching opportunities...")
+    with col2:
+        if st.button("✖ Cancel Search", key="cancel_search"):
+            release_fetch_job()
+            st.session_state['active_search'] = None
+            st.rerun()
+
+    partial = job.snapshot()
+    if partial is not None:
+        partial = normalize_dates(partial.copy())
+        display_metrics(partial)
+        st.markdown(build_cards_html(partial.head(PAGE_SIZES[1])), unsafe_allow_html=True)
+        st.caption(f"Showing the first {min(len(partial), PAGE_SIZES[1])} of {rows_loaded} records loaded so far")
+
+@st.cache_resource
+def get_sync_scheduler():
+    return SyncScheduler(
+        get_user_store(),
+        get_opportunity_cache(),
+        on_refresh=get_shared_results().invalidate
+    ).start()
+
+def display_saved_searches():
+    scheduler = get_sync_scheduler()  # starts the sync worker on first use
+    username = st.session_state.get('username')
+    saved = get_user_store().list_filters(username)
+    if not saved:
+        return
     
-    if naics and naics.strip():
-        params["ncode"] = naics.strip()
-    if agency and agency.strip():
-        params["organizationName"] = agency.strip()
-    if opportunity_type:
-        params["type"] = opportunity_type
-
-    with st.spinner("Fetching opportunities..."):
-        try:
-            response = requests.get(base_url, headers=headers, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "opportunitiesData" in data:
-                    opportunities = data["opportunitiesData"]
-                    df = pd.DataFrame(opportunities)
-                    
-                    if 'responseDeadLine' in df.columns:
-                        df['days_remaining'] = df['responseDeadLine'].apply(calculate_days_remaining)
-                    
-                    return df, data.get('totalRecords', 0)
-            else:
-                st.error(f"API Error: {response.status_code}")
-                st.write(response.text)
-            return None, 0
-            
-        except Exception as e:
-            st.error(f"Error: {str(e)}")
-            return None, 0
+    with st.expander("⭐ Saved Searches", expanded=True):
+        for name, filters in saved.items():
+            col1, col2 = st.columns([3, 1])
+            if col1.button(name, key=f"open_saved_{name}"):
+                st.session_state['active_search'] = dict(filters, name=name)
+            if col2.button("🗑️", key=f"delete_saved_{name}"):
+                get_user_store().delete_filter(username, name)
+                st.rerun()
+        
+        if scheduler.last_run is not None:
+            st.caption(f"Last synced {datetime.fromtimestamp(scheduler.last_run):%H:%M}")
+        for name, error in scheduler.last_errors(username).items():
+            st.caption(f"⚠️ {name}: {error}")
+
+def display_cache_stats():
+    cache = get_opportunity_cache()
+    with st.sidebar.expander("🗄️ Search Cache"):
+        # The TTL applies to every session's searches, so only admins set it
+        if st.session_state.get('username') == 'admin':
+            ttl_hours = st.number_input(
+                "Cache TTL (hours)",
+                min_value=0.0,
+                value=cache.ttl_seconds / 3600,
+                step=0.5,
+                key="cache_ttl_hours"
+            )
+            cache.ttl_seconds = ttl_hours * 3600
+        else:
+            st.caption(f"Results are cached for {cache.ttl_seconds / 3600:g} hours")
 
-def process_uploaded_file(uploaded_file):
+        stats = cache.stats()
+        col1, col2 = st.columns(2)
+        col1.metric("Hits", stats.get('hits', 0))
+        col2.metric("Misses", stats.get('misses', 0))
+        col1.metric("Refreshes", stats.get('incremental_refreshes', 0))
+        col2.metric("Entries", stats['entries'])
+        st.caption(f"{stats['size_bytes'] / 1024 / 1024:.1f} MB on disk")
+
+        shared = get_shared_results().stats()
+        col1, col2 = st.columns(2)
+        col1.metric("Shared Hit Rate", f"{shared['hit_rate']:.0%}")
+        col2.metric("API Calls Saved", shared['requests_saved'])
+        st.caption(f"{shared['entries']} shared results, {shared['bytes'] / 1024 / 1024:.1f} MB in memory, "
+                   f"{shared['coalesced']} coalesced requests")
+
+        if st.button("Clear Cache"):
+            cache.clear()
+            get_shared_results().invalidate()
+            st.rerun()
+
+def process_uploaded_file(uploaded_file, usecols=None):
     if uploaded_file is not None:
-        file_type = uploaded_file.type
+        kind = file_kind(uploaded_file)
+        if kind is None:
+            st.error(f"Unsupported file type for large files: {uploaded_file.type}")
+            st.info("For large files, please use Excel (.xlsx/.xls) or CSV format")
+            return None
 
         try:
-            if file_type in ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"]:
-                with st.spinner('Reading large Excel file... This may take a moment.'):
-                    try:
-                        df = pd.read_excel(uploaded_file, engine='openpyxl')  # Convert to pandas DataFrame
-                    except Exception as excel_err:
-                        st.error(f"Error reading Excel file: {str(excel_err)}")
-                        return None
-                    
-                    df = df.copy()
-                    
-                    st.info(f"Successfully loaded file: {uploaded_file.name}")
-                    st.write(f"Total rows: {len(df)}")
-                    st.write(f"Total columns: {len(df.columns)}")
-                    
-                    return df
-                    
-            elif file_type == "text/csv":
-                chunks = []
-                chunk_size = 5000
-                
-                with st.spinner('Reading large CSV file in chunks...'):
-                    try:
-                        for chunk in pd.read_csv(uploaded_file, chunksize=chunk_size):
-                            chunks.append(chunk)
-                            if len(chunks) % 5 == 0:
-                                st.write(f"Processed {len(chunks) * chunk_size} rows...")
-                        
-                        df = pd.concat(chunks, ignore_index=True)
-                        st.success("File successfully loaded!")
-                        return df
-                    except Exception as csv_err:
-                        st.error(f"Error reading CSV: {str(csv_err)}")
-                        return None
+            with st.spinner('Reading large file... This may take a moment.'):
+                status = st.empty()
+                df, stats = ingest(
+                    uploaded_file,
+                    kind,
+                    usecols=usecols,
+                    on_progress=lambda rows: status.write(f"Processed {rows} rows...")
+                )
+                status.empty()
 
-            else:
-                st.error(f"Unsupported file type for large files: {file_type}")
-                st.info("For large files, please use Excel (.xlsx/.xls) or CSV format")
-                return None
+            st.info(f"Successfully loaded file: {uploaded_file.name}")
+            st.caption(
+                f"{stats['rows']} rows x {stats['columns']} columns in {stats['seconds']:.1f}s "
+                f"({stats['rows_per_sec']:,.0f} rows/sec) | peak memory +{stats['peak_mb']:.1f} MB | "
+                f"in memory {stats['memory_mb']:.1f} MB"
+            )
+            return df
 
         except Exception as e:
             st.error("Error processing file")
             st.write("Debug Information:")
-            st.write(f"File type: {file_type}")
+            st.write(f"File type: {uploaded_file.type}")
             st.write(f"File size: {uploaded_file.size/1024/1024:.2f} MB")
             st.write(f"Error: {str(e)}")
             return None
 
+@st.cache_resource
+def get_dataset_store():
+    return DatasetStore()
+
+@timed("upload")
+def process_uploaded_batch(uploaded_files):
+    files = []
+    for uploaded_file in uploaded_files:
+        kind = file_kind(uploaded_file)
+        if kind is None:
+            st.error(f"Unsupported file type for large files: {uploaded_file.type}")
+            return None
+        files.append((uploaded_file.name, kind, uploaded_file))
+
+    bars = {name: st.progress(0.0, text=f"{name}: waiting...") for name, _, _ in files}
+
+    def on_progress(name, done, total, rows):
+        bars[name].progress(done / total, text=f"{name}: {done}/{total} sheets, {rows} rows")
+
+    try:
+        with st.spinner('Reading files in parallel... This may take a moment.'):
+            df, stats = ingest_batch(files, on_progress=on_progress)
+    except Exception as e:
+        st.error(f"Error processing files: {str(e)}")
+        return None
+    for bar in bars.values():
+        bar.empty()
+
+    st.info(f"Successfully loaded {stats['files']} files ({stats['sheets']} sheets)")
+    st.caption(
+        f"{stats['rows']} rows x {stats['columns']} columns in {stats['seconds']:.1f}s "
+        f"({stats['rows_per_sec']:,.0f} rows/sec) on {stats['workers']} workers | "
+        f"{stats['duplicates']} duplicates dropped | in memory {stats['memory_mb']:.1f} MB"
+    )
+    if stats['skipped_sheets']:
+        st.caption("Skipped sheets that don't match the data layout: " +
+                   ", ".join(f"{name} / {sheet}" for name, sheet in stats['skipped_sheets']))
+    return df
+
+def is_batch(uploaded_files):
+    if len(uploaded_files) > 1:
+        return True
+    uploaded_file = uploaded_files[0]
+    return file_kind(uploaded_file) == 'excel' and len(sheet_names(uploaded_file)) > 1
+
+@timed("upload")
+def load_uploaded_dataset(uploaded_files):
+    # Hash each upload once per session and parse it only the first time its
+    # content is seen; every later rerun memory-maps the stored Feather file.
+    # Several files (or a multi-sheet workbook) are merged into one dataset
+    # keyed by the digests of its files in upload order
+    digests = st.session_state.setdefault('upload_digests', {})
+    upload_ids = tuple(getattr(f, 'file_id', None) or (f.name, f.size) for f in uploaded_files)
+    digest = digests.get(upload_ids)
+    batch = None
+    if digest is None:
+        batch = is_batch(uploaded_files)
+        if batch:
+            parts = ":".join(content_hash(f) for f in uploaded_files)
+            digest = hashlib.sha256(f"batch:{parts}".encode()).hexdigest()
+        else:
+            digest = content_hash(uploaded_files[0])
+        digests[upload_ids] = digest
+
+    store = get_dataset_store()
+    if not store.contains(digest):
+        if batch is None:
+            batch = is_batch(uploaded_files)
+        if batch:
+            df = process_uploaded_batch(uploaded_files)
+            name = f"{uploaded_files[0].name} (+{len(uploaded_files) - 1} more)" if len(uploaded_files) > 1 \
+                else uploaded_files[0].name
+        else:
+            df = process_uploaded_file(uploaded_files[0])
+            name = uploaded_files[0].name
+        if df is None:
+            return None
+        store.put(digest, df, name)
+    return digest
+
+def display_dataset_store_admin():
+    store = get_dataset_store()
+    with st.sidebar.expander("🗂️ Stored Datasets"):
+        datasets = store.list()
+        st.caption(f"{len(datasets)} datasets, {datasets['size_mb'].sum():.1f} MB "
+                   f"of {store.max_bytes / 1024 / 1024:.0f} MB")
+        st.dataframe(datasets[['name', 'rows', 'columns', 'size_mb', 'accessed_at']], hide_index=True)
+
+        if not datasets.empty:
+            to_delete = st.selectbox(
+                "Dataset",
+                datasets['digest'],
+                format_func=lambda d: f"{datasets.set_index('digest').at[d, 'name']} ({d[:8]})",
+                key="dataset_store_delete"
+            )
+            if st.button("Delete Dataset"):
+                store.delete(to_delete)
+                st.rerun()
+
+def display_profiling_admin():
+    with st.sidebar.expander("⏱️ Profiling"):
+        enabled = st.checkbox("Record rerun timings", value=profiler.enabled, key="profiling_enabled")
+        trace_memory = st.checkbox("Track peak memory (slower)", value=profiler.trace_memory,
+                                   key="profiling_trace_memory", disabled=not enabled)
+        if (enabled, enabled and trace_memory) != (profiler.enabled, profiler.trace_memory):
+            profiler.configure(enabled, trace_memory)
+            st.rerun()
+        if not enabled:
+            return
+
+        st.write("Per stage, most recent reruns")
+        st.dataframe(profiler.stage_stats().round(2), hide_index=True)
+
+        recent = pd.DataFrame([
+            {
+                'time': datetime.fromtimestamp(r['started_at']).strftime('%H:%M:%S'),
+                'user': r['label'],
+                'ms': round(r['seconds'] * 1000, 1),
+                'slowest': max(r['stages'], key=lambda s: s['seconds'])['stage'] if r['stages'] else None,
+            }
+            for r in profiler.recent()
+        ])
+        st.write("Recent reruns")
+        st.dataframe(recent, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        if col1.button("Profile Next Rerun"):
+            st.session_state['profile_next_rerun'] = True
+            st.rerun()
+        if col2.button("Clear Timings"):
+            profiler.clear()
+            st.rerun()
+        if profiler.last_profile is not None:
+            report = profiler.last_profile
+            st.caption(f"cProfile of {report['label']}'s rerun at "
+                       f"{datetime.fromtimestamp(report['created_at']):%H:%M:%S}")
+            st.code(report['text'], language=None)
+            st.download_button("Download .prof", report['pstats'], "rerun.prof", "application/octet-stream")
+
 def secure_api_key_input():
     return st.text_input("SAM.gov API Key", type="password", help="Your SAM.gov API key is required for data access.")
 
+def frame_key(df):
+    # Cache key for derived results: the dataset version set where the frame
+    # was loaded plus which rows and columns it holds, since filtered slices
+    # inherit attrs and two slices of the same length must not collide
+    version = df.attrs.get('dataset_version')
+    if version is None:
+        return None
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        rows = f"{index.start}:{index.stop}:{index.step}"
+    else:
+        rows = hashlib.blake2b(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes(),
+                               digest_size=8).hexdigest()
+    return (version, rows, tuple(df.columns))
+
+@st.cache_resource(max_entries=16)
+def _cached_rollups(_df, key):
+    return compute_rollups(_df)
+
+def get_rollups(df):
+    key = frame_key(df)
+    if key is None:
+        return compute_rollups(df)
+    return _cached_rollups(df, key)
+
+@timed("display_metrics")
 def display_metrics(df):
+    kpis = get_rollups(df)['kpis']
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -182,49 +474,453 @@ def display_metrics(df):
                 <h3>Total Opportunities</h3>
                 <h2>{}</h2>
             </div>
-        """.format(len(df)), unsafe_allow_html=True)
+        """.format(kpis['total']), unsafe_allow_html=True)
     
     with col2:
-        active_opportunities = len(df[df['days_remaining'] > 0]) if 'days_remaining' in df.columns else 0
         st.markdown("""
             <div class="metric-card">
                 <h3>Active Opportunities</h3>
                 <h2>{}</h2>
             </div>
-        """.format(active_opportunities), unsafe_allow_html=True)
+        """.format(kpis['active']), unsafe_allow_html=True)
     
     with col3:
-        avg_response_time = df['days_remaining'].mean() if 'days_remaining' in df.columns else 0
         st.markdown("""
             <div class="metric-card">
                 <h3>Avg Response Time</h3>
                 <h2>{:.1f} days</h2>
             </div>
-        """.format(avg_response_time), unsafe_allow_html=True)
+        """.format(kpis['avg_days_remaining']), unsafe_allow_html=True)
     
     with col4:
-        unique_agencies = df['fullParentPathName'].nunique() if 'fullParentPathName' in df.columns else 0
         st.markdown("""
             <div class="metric-card">
                 <h3>Unique Agencies</h3>
                 <h2>{}</h2>
             </div>
-        """.format(unique_agencies), unsafe_allow_html=True)
-
-def create_geographic_map(df):
-    if 'placeOfPerformance' in df.columns:
-        locations = df['placeOfPerformance'].dropna().unique()
-        if len(locations) > 0:
-            st.write("Geographic Distribution of Opportunities")
-            fig = px.scatter_geo(
-                df,
-                locations='placeOfPerformance',
-                hover_name='title',
-                title="Opportunities by Location"
+        """.format(kpis['unique_agencies']), unsafe_allow_html=True)
+
+CARD_FIELDS = [
+    ('title', 'No Title'),
+    ('type', 'N/A'),
+    ('postedDate', 'N/A'),
+    ('responseDeadLine', 'N/A'),
+    ('fullParentPathName', 'N/A'),
+    ('naicsCode', 'N/A')
+]
+PAGE_SIZES = [10, 25, 50, 100]
+GRID_PAGE_SIZES = [100, 1000, 10000]
+GRID_MODE_THRESHOLD = 10000
+
+def _html_column(page, field, default):
+    if field not in page.columns:
+        return pd.Series(default, index=page.index)
+    column = page[field]
+    if pd.api.types.is_datetime64_any_dtype(column):
+        values = column.dt.strftime('%Y-%m-%d').where(column.notna(), default)
+    else:
+        values = column.astype(str).where(column.notna(), default)
+    return (values.str.replace('&', '&amp;', regex=False)
+                  .str.replace('<', '&lt;', regex=False)
+                  .str.replace('>', '&gt;', regex=False))
+
+def build_cards_html(page):
+    # Vectorized over the rows of a single page; never touches the full frame
+    if page.empty:
+        return ""
+    title, opp_type, posted, deadline, agency, naics = (
+        _html_column(page, field, default) for field, default in CARD_FIELDS
+    )
+    cards = (
+        '<div class="opportunity-card"><h3>' + title + '</h3>'
+        + '<p><strong>Type:</strong> ' + opp_type
+        + ' | <strong>Posted:</strong> ' + posted
+        + ' | <strong>Deadline:</strong> ' + deadline + '</p>'
+        + '<p><strong>Agency:</strong> ' + agency + '</p>'
+        + '<p><strong>NAICS:</strong> ' + naics + '</p></div>'
+    )
+    return "\n".join(cards.tolist())
+
+@timed("opportunity_list")
+def render_opportunity_list(df, key, positions=None, contacts=None):
+    # positions: row order to display; only the visible page is sliced out
+    total_rows = len(df) if positions is None else len(positions)
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        view_mode = st.radio(
+            "View",
+            ["Cards", "Grid"],
+            index=1 if total_rows > GRID_MODE_THRESHOLD else 0,
+            horizontal=True,
+            key=f"{key}_view_mode"
+        )
+    with col2:
+        if view_mode == "Grid":
+            page_size = st.selectbox("Page size", GRID_PAGE_SIZES, index=1, key=f"{key}_grid_page_size")
+        else:
+            page_size = st.selectbox("Page size", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    page_count = max(1, -(-total_rows // page_size))
+    with col3:
+        page_number = st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            key=f"{key}_page_number"
+        )
+
+    start = (int(page_number) - 1) * page_size
+    page = df.iloc[start:start + page_size] if positions is None else df.iloc[positions[start:start + page_size]]
+    st.caption(f"Showing {start + 1 if total_rows else 0}-{start + len(page)} of {total_rows} opportunities")
+
+    if view_mode == "Grid":
+        st.dataframe(page, use_container_width=True, hide_index=True)
+    else:
+        st.markdown(build_cards_html(page), unsafe_allow_html=True)
+
+    if contacts is not None and not contacts.empty and 'noticeId' in page.columns:
+        with st.expander("Points of contact"):
+            page_contacts = contacts[contacts['noticeId'].isin(page['noticeId'])]
+            st.dataframe(page_contacts, use_container_width=True, hide_index=True)
+
+@st.cache_resource(max_entries=16)
+def _cached_state_totals(_df, key):
+    return aggregate_by_state(_df)
+
+@timed("geographic_map")
+def create_geographic_map(df, key="geo"):
+    if 'placeOfPerformance' not in df.columns:
+        st.info("No place of performance data available")
+        return
+
+    frame = frame_key(df)
+    if frame is None:
+        totals, unresolved = aggregate_by_state(df)
+    else:
+        totals, unresolved = _cached_state_totals(df, frame)
+
+    if totals.empty:
+        st.warning("No places of performance could be matched to a U.S. state")
+        return
+
+    st.write("Geographic Distribution of Opportunities")
+    value = st.radio(
+        "Color by",
+        ['count', 'active', 'award_total'],
+        format_func={'count': 'Opportunities', 'active': 'Active', 'award_total': 'Award Total'}.get,
+        horizontal=True,
+        key=f"{key}_map_value"
+    )
+    st.plotly_chart(choropleth_figure(totals, value), use_container_width=True)
+    if unresolved:
+        st.caption(f"{unresolved} opportunities have no recognizable U.S. place of performance")
+
+
+
+@st.cache_resource(max_entries=8)
+def _mapped_dataset(digest, spec, day):
+    # Keyed on the day as well: days_remaining and the postedDate fallback
+    # are relative to today and would go stale overnight
+    store = get_dataset_store()
+    columns = store.columns(digest)
+    df, _, stats = to_records(apply_mapping(store.load(digest, spec_columns(spec, columns)), spec))
+    df.attrs['dataset_version'] = f"{digest}:{spec}:{day}"
+    df.attrs['record_memory'] = stats
+    # Placeholders rather than data; snapshots leave them out
+    df.attrs['filled_columns'] = filled_fields(spec, columns)
+    return normalize_dates(df)
+
+def get_mapped_dataset(digest, spec):
+    # The frame is shared by every session that maps the same file the same
+    # way: read-only, copy before adding or changing columns
+    return _mapped_dataset(digest, spec, datetime.now().date().isoformat())
+
+def display_record_memory(df):
+    stats = df.attrs.get('record_memory')
+    if stats is None:
+        return
+    caption = f"Typed records: {stats['before_mb']:.1f} MB as loaded, {stats['after_mb']:.1f} MB typed"
+    if stats['contacts']:
+        caption += f" (+{stats['contacts_mb']:.1f} MB for {stats['contacts']} contacts)"
+    st.caption(caption)
+
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+def render_export(digest, spec):
+    # The file is only written when the button is clicked, chunk by chunk
+    # into a spooled temp file, and reused for the same dataset and mapping
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox("Export format", list(EXPORT_FORMATS), key="export_format")
+    extension, mime = EXPORT_FORMATS[fmt]
+    with col2:
+        st.download_button(
+            "Download Processed Data",
+            lambda: get_export_cache().read(get_mapped_dataset(digest, spec).attrs['dataset_version'], fmt,
+                                            lambda: get_mapped_dataset(digest, spec)),
+            f"processed_opportunities.{extension}",
+            mime
+        )
+
+@timed("analytics_charts")
+def render_analytics(df):
+    # Plotly only ever sees the pre-aggregated tables, never the rows
+    rollups = get_rollups(df)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if 'type' in rollups:
+            fig1 = px.pie(
+                rollups['type'],
+                names='type',
+                values='count',
+                title="Distribution by Opportunity Type"
+            )
+            st.plotly_chart(fig1)
+    
+    with col2:
+        if 'agency' in rollups:
+            top_agencies = rollups['agency'].head(10)
+            fig2 = px.bar(
+                top_agencies,
+                x='count',
+                y='agency',
+                orientation='h',
+                title="Top 10 Agencies"
+            )
+            st.plotly_chart(fig2)
+    
+    col3, col4 = st.columns(2)
+    
+    with col3:
+        if 'naics' in rollups:
+            fig3 = px.bar(
+                rollups['naics'].head(10),
+                x='count',
+                y='naics',
+                orientation='h',
+                title="Top 10 NAICS Codes"
+            )
+            st.plotly_chart(fig3)
+    
+    with col4:
+        if 'set_aside' in rollups:
+            fig4 = px.pie(
+                rollups['set_aside'].head(10),
+                names='set_aside',
+                values='count',
+                title="Set-Aside Types"
             )
-            st.plotly_chart(fig)
+            st.plotly_chart(fig4)
+    
+    if 'week' in rollups and not rollups['week'].empty:
+        fig5 = px.bar(
+            rollups['week'],
+            x='week',
+            y=['active', 'count'],
+            barmode='overlay',
+            title="Opportunities Posted per Week"
+        )
+        st.plotly_chart(fig5, use_container_width=True)
+
+@timed("timeline_charts")
+def render_timeline(df, key):
+    try:
+        df_timeline = timeline_rows(df)
+        
+        if df_timeline.empty:
+            st.warning("No valid date data available for timeline visualization")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            lane_label = st.radio("Lanes", list(LANE_COLUMNS), horizontal=True, key=f"{key}_timeline_lanes")
+        with col2:
+            bucket = st.selectbox("Bucket", list(BUCKETS), index=1, key=f"{key}_timeline_bucket")
+        with col3:
+            max_bars = st.number_input("Max bars in lane", min_value=10, max_value=20000,
+                                       value=DEFAULT_MAX_BARS, step=100, key=f"{key}_timeline_max_bars")
+        
+        lane_column = LANE_COLUMNS[lane_label]
+        density = lane_density(df_timeline, lane_column, BUCKETS[bucket])
+        st.plotly_chart(density_figure(density, lane_label), use_container_width=True)
+        
+        lanes = density.groupby('lane')['open'].max().sort_values(ascending=False).index.tolist()
+        drill_lane = st.selectbox(f"Drill into {lane_label.lower()}", ['None'] + lanes,
+                                  key=f"{key}_timeline_drill")
+        if drill_lane != 'None':
+            timeline_fig, in_lane = drilldown_figure(df_timeline, lane_column, drill_lane, int(max_bars))
+            if in_lane > max_bars:
+                st.caption(f"Showing the {int(max_bars)} soonest deadlines of {in_lane}")
+            st.plotly_chart(timeline_fig, use_container_width=True)
+    except Exception as e:
+        st.error(f"Could not create timeline: {str(e)}")
+        st.info("Timeline visualization requires valid date formats")
+
+DASHBOARD_VIEWS = [
+    "📋 Opportunities",
+    "📈 Analytics",
+    "📅 Timeline",
+    "🌍 Geographic Distribution",
+    "🔄 What changed"
+]
+
+@st.cache_resource(max_entries=16)
+def get_search_index(name):
+    return SearchIndex()
+
+FACET_LABELS = {
+    'type': "Type",
+    'set_aside': "Set-Aside",
+    'agency': "Agency",
+    'naics': "NAICS"
+}
+
+@st.cache_resource(max_entries=16)
+def get_dataset_view(_df, key):
+    return DatasetView(_df)
+
+@timed("opportunity_search")
+def render_opportunity_search(df, key, index_name, set_aside=None):
+    # Keyword search and facets are answered by the local index, sorting and
+    # row filters by permutations and masks cached per dataset version.
+    # Returns the selected row positions in display order
+    version = df.attrs.get('dataset_version')
+    index = get_search_index(index_name)
+    index.update(df, version)
+    frame = frame_key(df)
+    view = DatasetView(df) if frame is None else get_dataset_view(df, frame)
+    
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        query = st.text_input("Search", placeholder="Keywords in title, agency or NAICS",
+                              key=f"{key}_search_query")
+    with col2:
+        sort_by = st.selectbox(
+            "Sort by",
+            list(SORT_KEYS),
+            key=f"{key}_sort_by"
+        )
+    with col3:
+        filter_active = st.checkbox("Show only active opportunities", key=f"{key}_filter_active")
+    
+    filters = {name: st.session_state.get(f"{key}_facet_{name}", []) for name in FACET_LABELS}
+    hits, facets = index.search(query, filters)
+    
+    with st.expander("Facets"):
+        facet_cols = st.columns(len(FACET_LABELS))
+        for col, (name, label) in zip(facet_cols, FACET_LABELS.items()):
+            counts = facets[name]
+            options = list(dict.fromkeys(list(counts.index[:50]) + filters[name]))
+            col.multiselect(
+                label,
+                options,
+                format_func=lambda value, counts=counts: f"{value} ({counts.get(value, 0)})",
+                key=f"{key}_facet_{name}"
+            )
+    
+    masks = []
+    if filter_active:
+        masks.append(view.mask('active'))
+    if set_aside:
+        masks.append(view.mask('set_aside', [set_aside_code(set_aside)]))
+    searched = bool(query.strip()) or any(filters.values())
+    return view.select(sort_by, masks, rows=hits if searched else None)
+
+@st.cache_resource
+def get_snapshot_store():
+    return SnapshotStore()
 
+@st.cache_resource(max_entries=4)
+def get_snapshot_diff(old_id, new_id):
+    return get_snapshot_store().diff(old_id, new_id)
 
+CHANGES_SHOWN = 200
+
+@timed("record_snapshot")
+def record_snapshot(source, df):
+    # Keeps each new version of a search or upload series for "What changed".
+    # False when the data has no record key to track changes by
+    version = df.attrs.get('dataset_version')
+    store = get_snapshot_store()
+    if version is None or store.has_version(source, version):
+        return True
+    try:
+        with st.spinner("Saving snapshot..."):
+            store.record(source, df, version)
+    except ValueError:
+        return False
+    return True
+
+@timed("changes")
+def render_changes(source, key):
+    store = get_snapshot_store()
+    snapshots = store.list(source)
+    if len(snapshots) < 2:
+        st.info("Changes show up here once this search or file has been loaded again with new data")
+        return
+
+    labels = {row.id: f"{row.created_at:%Y-%m-%d %H:%M} ({row.rows:,} records)"
+              for row in snapshots.itertuples()}
+    ids = list(labels)
+    col1, col2 = st.columns(2)
+    with col1:
+        old_id = st.selectbox("Compare", ids, index=1, format_func=labels.get, key=f"{key}_changes_old")
+    with col2:
+        new_id = st.selectbox("With", ids, index=0, format_func=labels.get, key=f"{key}_changes_new")
+    if old_id == new_id:
+        st.info("Pick two different snapshots")
+        return
+
+    diff = get_snapshot_diff(old_id, new_id)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Added", len(diff['added']))
+    col2.metric("Removed", len(diff['removed']))
+    col3.metric("Modified", len(diff['modified']))
+    col4.metric("Unchanged", diff['unchanged'])
+
+    change = st.radio("Show", ["Added", "Removed", "Modified"], horizontal=True, key=f"{key}_changes_kind")
+    keys = diff[change.lower()]
+    if len(keys) == 0:
+        st.write(f"No {change.lower()} records")
+        return
+    if len(keys) > CHANGES_SHOWN:
+        st.caption(f"Showing the first {CHANGES_SHOWN} of {len(keys)} {change.lower()} records")
+    keys = keys[:CHANGES_SHOWN]
+
+    if change == "Modified":
+        st.dataframe(store.field_changes(old_id, new_id, keys).astype(str), hide_index=True)
+    else:
+        rows = store.rows(new_id if change == "Added" else old_id, keys)
+        st.dataframe(rows.drop(columns=ROW_HASH), hide_index=True)
+
+def render_dashboard(df, key, index_name, set_aside=None, snapshot_source=None, contacts=None):
+    display_metrics(df)
+    display_record_memory(df)
+    tracked = snapshot_source is not None and record_snapshot(snapshot_source, df)
+    
+    # A radio instead of st.tabs so only the selected view is computed
+    view = st.radio("View", DASHBOARD_VIEWS, horizontal=True, key=f"{key}_view",
+                    label_visibility="collapsed")
+    
+    if view == DASHBOARD_VIEWS[0]:
+        positions = render_opportunity_search(df, key, index_name, set_aside)
+        render_opportunity_list(df, key=key, positions=positions, contacts=contacts)
+    elif view == DASHBOARD_VIEWS[1]:
+        render_analytics(df)
+    elif view == DASHBOARD_VIEWS[2]:
+        render_timeline(df, key)
+    elif view == DASHBOARD_VIEWS[3]:
+        create_geographic_map(df, key)
+    elif snapshot_source is None:
+        st.info("Change tracking isn't available for this data")
+    elif not tracked:
+        st.info("Change tracking needs a noticeId or title mapping")
+    else:
+        render_changes(snapshot_source, key)
 
     # At the start of your main() function
 def main():
@@ -266,165 +962,103 @@ def main():
 
         st.sidebar.markdown("---")
         st.sidebar.header("📁 File Upload")
-        uploaded_file = st.sidebar.file_uploader(
-            "Upload Data File",
+        uploaded_files = st.sidebar.file_uploader(
+            "Upload Data Files",
             type=['xlsx', 'xls', 'csv'],
-            help="Upload Excel or CSV files (supports large files up to 250MB)",
-            accept_multiple_files=False
+            help="Upload Excel or CSV files (supports large files up to 250MB). "
+                 "Several files, or every sheet of a workbook, are merged into one dataset",
+            accept_multiple_files=True
         )
 
-        if uploaded_file:
-            file_size_mb = uploaded_file.size / (1024 * 1024)
-            st.sidebar.info(f"File Size: {file_size_mb:.2f} MB")
+        if uploaded_files:
+            file_size_mb = sum(f.size for f in uploaded_files) / (1024 * 1024)
+            st.sidebar.info(f"{len(uploaded_files)} file(s), {file_size_mb:.2f} MB")
 
         data_source = st.sidebar.radio(
             "Choose Data Source",
             ["SAM.gov API", "Uploaded File"]
         )
             
+        current_filters = {
+            "naics": naics_code,
+            "agency": agency_name,
+            "date_range": date_range,
+            "type": opportunity_type,
+            "set_aside": set_aside
+        }
+        filter_name = st.text_input("Filter Name", value="My search", key="saved_filter_name")
         if st.button("💾 Save Current Filters"):
-            current_filters = {
-                "naics": naics_code,
-                "agency": agency_name,
-                "date_range": date_range,
-                "type": opportunity_type,
-                "set_aside": set_aside
-            }
-            st.session_state['saved_filters'] = current_filters
+            username = st.session_state.get('username')
+            get_user_store().save_filter(username, filter_name.strip() or "My search", current_filters)
+            scheduler = get_sync_scheduler()
+            scheduler.register_api_key(username, api_key)
+            scheduler.run_now()
             st.success("Filters saved!")
+        
+        display_saved_searches()
 
-    if data_source == "Uploaded File" and uploaded_file:
+    display_cache_stats()
+    if st.session_state.get('username') == 'admin':
+        display_dataset_store_admin()
+        session_admin_panel()
+        display_profiling_admin()
+
+    if data_source == "Uploaded File" and uploaded_files:
         try:
-            if uploaded_file.type == "text/csv":
-                df = pd.read_csv(uploaded_file)
-            elif uploaded_file.type in ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"]:
-                df = pd.read_excel(uploaded_file, engine='openpyxl')
+            digest = load_uploaded_dataset(uploaded_files)
             
-            if df is not None:
-                st.success(f"Successfully loaded data from {uploaded_file.name}")
+            if digest is not None:
+                store = get_dataset_store()
+                st.success(f"Successfully loaded data from {', '.join(f.name for f in uploaded_files)}")
                 
                 st.subheader("Data Preview")
-                st.dataframe(df.head())
+                st.dataframe(store.preview(digest))
                 
                 st.subheader("Column Mapping")
                 st.write("Map your columns to standard fields:")
                 
-                standard_fields = {
-                    'title': 'Opportunity Title',
-                    'type': 'Opportunity Type',
-                    'postedDate': 'Posted Date',
-                    'responseDeadLine': 'Response Deadline',
-                    'naicsCode': 'NAICS',
-                    'fullParentPathName': 'Component'
-                }
-                
                 mapping = {}
-                cols = df.columns.tolist()
+                cols = [c for c in store.columns(digest) if c not in PROVENANCE_COLUMNS]
+                saved_mapping = load_saved_mapping(cols) or {}
+                if saved_mapping:
+                    st.info("Using the saved mapping for files with these columns")
                 
                 st.write("Available columns in your file:", cols)
                 
-                for std_field, description in standard_fields.items():
+                for std_field, description in STANDARD_FIELDS.items():
+                    saved_source = saved_mapping.get(std_field)
                     mapping[std_field] = st.selectbox(
                         f"Map '{description}' to:",
                         ['None'] + cols,
+                        index=cols.index(saved_source) + 1 if saved_source in cols else 0,
                         key=f"map_{std_field}"
                     )
+                spec = mapping_spec(mapping)
                 
-                if st.button("Apply Mapping"):
-                    mapped_df = pd.DataFrame()
-                    for std_field, source_field in mapping.items():
-                        if source_field != 'None':
-                            mapped_df[std_field] = df[source_field]
-                        else:
-                            if std_field == 'title':
-                                mapped_df[std_field] = df['APFS Number'].astype(str) if 'APFS Number' in df.columns else 'N/A'
-                            elif std_field == 'type':
-                                mapped_df[std_field] = 'N/A'
-                            elif std_field == 'postedDate':
-                                mapped_df[std_field] = pd.Timestamp.now().strftime('%Y-%m-%d')
-                            elif std_field == 'responseDeadLine':
-                                mapped_df[std_field] = 'N/A'
-                            elif std_field == 'naicsCode':
-                                mapped_df[std_field] = df['NAICS'].astype(str) if 'NAICS' in df.columns else 'N/A'
-                            elif std_field == 'fullParentPathName':
-                                mapped_df[std_field] = df['Component'].astype(str) if 'Component' in df.columns else 'N/A'
-                    
-                    mapped_df['uiLink'] = '#'
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("Apply Mapping"):
+                        st.session_state['applied_mapping'] = (digest, spec)
+                with col2:
+                    if st.button("💾 Save Mapping"):
+                        save_mapping(cols, spec)
+                        st.success("Mapping saved for files with these columns")
+                
+                applied = st.session_state.get('applied_mapping')
+                if applied is not None and applied[0] == digest:
+                    with stage("apply_mapping"):
+                        df = get_mapped_dataset(*applied)
                     
-                    if not mapped_df.empty:
+                    if not df.empty:
                         st.success("Column mapping applied successfully!")
-                        df = mapped_df
-                        
-                        if 'responseDeadLine' in df.columns:
-                            df['days_remaining'] = df['responseDeadLine'].apply(calculate_days_remaining)
+                        render_dashboard(df, key="upload", index_name=digest, set_aside=set_aside,
+                                         snapshot_source=f"upload:{schema_fingerprint(cols)}:{spec}")
                         
-                        display_metrics(df)
-                        
-                        tabs = st.tabs([
-                            "📋 Opportunities",
-                            "📈 Analytics",
-                            "📅 Timeline",
-                            "🌍 Geographic Distribution"
-                        ])
-                        
-                        with tabs[0]:
-                            for _, row in df.iterrows():
-                                st.markdown("""
-                                    <div class="opportunity-card">
-                                        <h3>{}</h3>
-                                        <p><strong>Type:</strong> {} | <strong>Posted:</strong> {} | <strong>Deadline:</strong> {}</p>
-                                        <p><strong>Agency:</strong> {}</p>
-                                        <p><strong>NAICS:</strong> {}</p>
-                                    </div>
-                                """.format(
-                                    row.get('title', 'No Title'),
-                                    row.get('type', 'N/A'),
-                                    row.get('postedDate', 'N/A'),
-                                    row.get('responseDeadLine', 'N/A'),
-                                    row.get('fullParentPathName', 'N/A'),
-                                    row.get('naicsCode', 'N/A')
-                                ), unsafe_allow_html=True)
-                        
-                        with tabs[1]:
-                            if 'type' in df.columns:
-                                fig = px.pie(df, names='type', title="Distribution by Type")
-                                st.plotly_chart(fig)
-                        
-                        with tabs[2]:
-                            try:
-                                df['postedDate'] = pd.to_datetime(df['postedDate'], errors='coerce')
-                                df['responseDeadLine'] = pd.to_datetime(df['responseDeadLine'], errors='coerce')
-                                
-                                df_timeline = df.dropna(subset=['postedDate', 'responseDeadLine'])
-                                
-                                if not df_timeline.empty:
-                                    timeline_fig = px.timeline(
-                                        df_timeline,
-                                        x_start='postedDate',
-                                        x_end='responseDeadLine',
-                                        y='title',
-                                        title="Opportunity Timeline"
-                                    )
-                                    st.plotly_chart(timeline_fig, use_container_width=True)
-                                else:
-                                    st.warning("No valid date data available for timeline visualization")
-                            except Exception as e:
-                                st.error(f"Could not create timeline: {str(e)}")
-                                st.info("Timeline visualization requires valid date formats")
-                        
-                        with tabs[3]:
-                            create_geographic_map(df)
-                        
-                        st.download_button(
-                            "Download Processed Data",
-                            df.to_csv(index=False),
-                            "processed_opportunities.csv",
-                            "text/csv"
-                        )
+                        render_export(*applied)
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
             st.write("Debug info:")
-            st.write("File type:", uploaded_file.type)
+            st.write("File types:", [f.type for f in uploaded_files])
             st.write("Error details:", str(e))
 
     if data_source == "SAM.gov API":
@@ -432,101 +1066,57 @@ def main():
             if not api_key:
                 st.error("Please enter your SAM.gov API key")
             else:
-                df, total_records = fetch_opportunities(
-                    api_key, 
-                    naics_code, 
-                    agency_name, 
-                    date_range,
-                    opportunity_type
+                get_sync_scheduler().register_api_key(st.session_state.get('username'), api_key)
+                st.session_state['active_search'] = current_filters
+                job = st.session_state.get('fetch_job')
+                if job is not None and job.state != 'running':
+                    # Lets a failed search be retried
+                    release_fetch_job()
+        
+        search = st.session_state.get('active_search')
+        if search is not None:
+            # Saved searches are kept fresh by the sync worker, so they are
+            # served from local data even when the cached copy is past its TTL
+            result = fetch_opportunities(
+                api_key, 
+                search['naics'], 
+                search['agency'], 
+                search['date_range'],
+                search['type'],
+                allow_stale=search.get('name') is not None,
+                set_aside=search.get('set_aside')
+            )
+            if search.get('name'):
+                st.caption(f"⭐ Saved search: {search['name']}")
+            
+            df, total_records, contacts = None, 0, None
+            if isinstance(result, FetchJob):
+                if result.state == 'error':
+                    if isinstance(result.error, SamApiError):
+                        st.error(f"API Error: {result.error.status_code}")
+                        st.write(result.error.text)
+                    else:
+                        st.error(f"Error: {str(result.error)}")
+                elif result.state == 'running':
+                    render_fetch_progress(result)
+            else:
+                df, total_records, contacts = result
+            
+            if df is not None and not df.empty:
+                st.success(f"Found {total_records} total records")
+
+                search_key = make_key(normalize_params(search['naics'], search['agency'], search['date_range'],
+                                                       search['type'], search.get('set_aside')))
+                render_dashboard(
+                    df,
+                    key="api",
+                    index_name=search_key,
+                    set_aside=search.get('set_aside'),
+                    snapshot_source=f"search:{search_key}",
+                    contacts=contacts
                 )
-                
-                if df is not None and not df.empty:
-                    st.success(f"Found {total_records} total records")
-                    
-                    display_metrics(df)
-                    
-                    tab1, tab2, tab3, tab4 = st.tabs([
-                        "📋 Opportunities", 
-                        "📈 Analytics", 
-                        "🌍 Geographic Distribution",
-                        "📅 Timeline"
-                    ])
-                    
-                    with tab1:
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            sort_by = st.selectbox(
-                                "Sort by",
-                                ["Posted Date", "Response Deadline", "Agency"]
-                            )
-                        with col2:
-                            filter_active = st.checkbox("Show only active opportunities")
-                        
-                        if filter_active:
-                            df = df[df['days_remaining'] > 0]
-                        
-                        for _, row in df.iterrows():
-                            st.markdown("""
-                                <div class="opportunity-card">
-                                    <h3>{}</h3>
-                                    <p><strong>Type:</strong> {} | <strong>Posted:</strong> {} | <strong>Deadline:</strong> {}</p>
-                                    <p><strong>Agency:</strong> {}</p>
-                                    <p><strong>NAICS:</strong> {}</p>
-                                </div>
-                            """.format(
-                                row.get('title', 'No Title'),
-                                row.get('type', 'N/A'),
-                                row.get('postedDate', 'N/A'),
-                                row.get('responseDeadLine', 'N/A'),
-                                row.get('fullParentPathName', 'N/A'),
-                                row.get('naicsCode', 'N/A')
-                            ), unsafe_allow_html=True)
-                    
-                    with tab2:
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            fig1 = px.pie(
-                                df, 
-                                names='type', 
-                                title="Distribution by Opportunity Type"
-                            )
-                            st.plotly_chart(fig1)
-                        
-                        with col2:
-                            agency_counts = df['fullParentPathName'].value_counts().head(10) if 'fullParentPathName' in df.columns else []
-                            fig2 = px.bar(
-                                x=agency_counts.values,
-                                y=agency_counts.index,
-                                orientation='h',
-                                title="Top 10 Agencies"
-                            )
-                            st.plotly_chart(fig2)
-                    
-                    with tab3:
-                        create_geographic_map(df)
-                    
-                    with tab4:
-                        try:
-                            df['postedDate'] = pd.to_datetime(df['postedDate'], errors='coerce')
-                            df['responseDeadLine'] = pd.to_datetime(df['responseDeadLine'], errors='coerce')
-                            
-                            df_timeline = df.dropna(subset=['postedDate', 'responseDeadLine'])
-                            
-                            if not df_timeline.empty:
-                                timeline_fig = px.timeline(
-                                    df_timeline,
-                                    x_start='postedDate',
-                                    x_end='responseDeadLine',
-                                    y='title',
-                                    title="Opportunity Timeline"
-                                )
-                                st.plotly_chart(timeline_fig, use_container_width=True)
-                            else:
-                                st.warning("No valid date data available for timeline visualization")
-                        except Exception as e:
-                            st.error(f"Could not create timeline: {str(e)}")
-                            st.info("Timeline visualization requires valid date formats")
 
 if __name__ == "__main__":
-    main()
+    with profiler.rerun(label=st.session_state.get('username'),
+                        profile=st.session_state.pop('profile_next_rerun', False)):
+        main()
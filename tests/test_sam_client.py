@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+import sam_client
+from benchmarks.mock_sam import MockSamServer
+
+
+def fetch(server, **kwargs):
+    kwargs.setdefault('page_size', 100)
+    return sam_client.fetch_all("test-key", {}, base_url=server.url, **kwargs)
+
+
+def test_pages_merge_in_offset_order_without_duplicates():
+    # Overlapping pages repeat the previous page's tail; 429s are retried
+    with MockSamServer(total=2000, latency=0.01, fail_every=7, overlap=5) as server:
+        df, total = fetch(server, max_workers=4)
+    ids = df['noticeId'].tolist()
+    assert total == 2000
+    assert len(ids) == 2000
+    assert ids == sorted(ids)
+    assert df['noticeId'].is_unique
+
+
+def test_requests_in_flight_are_capped():
+    # Two searches with more workers than the process-wide limit
+    with MockSamServer(total=3000, latency=0.05) as server:
+        threads = [threading.Thread(target=fetch, args=(server,), kwargs={'max_workers': 12}) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert sam_client.MAX_IN_FLIGHT == 8
+    assert server.max_in_flight == sam_client.MAX_IN_FLIGHT
+
+
+def test_retry_after_is_honoured():
+    # The second request is rate limited and must wait Retry-After seconds
+    with MockSamServer(total=200, latency=0, fail_every=2, retry_after=0.3) as server:
+        start = time.perf_counter()
+        df, _ = fetch(server, max_workers=1)
+        elapsed = time.perf_counter() - start
+    assert len(df) == 200
+    assert server.requests == 3
+    assert elapsed >= 0.3
+
+
+def test_gives_up_after_max_retries():
+    with MockSamServer(total=100, latency=0, fail_every=1) as server:
+        with pytest.raises(sam_client.SamApiError) as error:
+            fetch(server)
+    assert error.value.status_code == 429
+    assert server.requests == sam_client.MAX_RETRIES + 1
+
+
+def test_cancel_stops_a_search():
+    cancel = threading.Event()
+    with MockSamServer(total=5000, latency=0.05) as server:
+        def on_page(done, expected, rows):
+            cancel.set()
+        with pytest.raises(sam_client.FetchCancelled):
+            fetch(server, max_workers=2, on_page=on_page, cancel=cancel)
+        requests = server.requests
+    assert requests < 50
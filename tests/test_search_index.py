@@ -0,0 +1,42 @@
+import pandas as pd
+
+from search_index import SearchIndex
+
+
+def records(titles, agencies=None):
+    return pd.DataFrame({
+        'noticeId': [f"N{i}" for i in range(len(titles))],
+        'title': titles,
+        'fullParentPathName': agencies or ['ARMY'] * len(titles),
+        'description': [f"https://api.sam.gov/prod/opportunities/v1/noticedesc?noticeid=N{i}"
+                        for i in range(len(titles))],
+    })
+
+
+def test_description_links_are_not_indexed():
+    index = SearchIndex()
+    index.update(records(['Radar upgrade', 'Cloud hosting']), 'v1')
+    assert len(index.search('gov')[0]) == 0
+    assert len(index.search('radar')[0]) == 1
+
+
+def test_changed_records_are_reindexed():
+    index = SearchIndex()
+    index.update(records(['Radar upgrade', 'Cloud hosting']), 'v1')
+    refreshed = records(['Radar upgrade', 'Satellite hosting', 'Boat repair'], ['ARMY', 'NAVY', 'NAVY'])
+    assert index.update(refreshed, 'v2') == 2
+
+    assert len(index) == 3
+    assert len(index.search('cloud')[0]) == 0
+    assert list(index.search('hosting')[0]) == [1]
+    hits, facets = index.search('')
+    assert sorted(hits) == [0, 1, 2]
+    assert facets['agency'].to_dict() == {'NAVY': 2, 'ARMY': 1}
+
+
+def test_unchanged_records_are_not_retokenized():
+    index = SearchIndex()
+    df = records(['Radar upgrade', 'Cloud hosting'])
+    index.update(df, 'v1')
+    assert index.update(df.iloc[::-1], 'v2') == 0
+    assert list(index.search('cloud')[0]) == [0]
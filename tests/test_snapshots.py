@@ -0,0 +1,36 @@
+import os
+
+import pandas as pd
+
+from snapshots import SnapshotStore
+
+
+def frame(rows, seed):
+    return pd.DataFrame({'noticeId': [f"N{i}" for i in range(rows)],
+                         'title': [f"Opportunity {i} v{seed}" for i in range(rows)]})
+
+
+def test_byte_budget_evicts_least_recently_used_across_sources(tmp_path):
+    store = SnapshotStore(root=str(tmp_path))
+    first = store.record('search:a', frame(2000, 0), 'v0')
+    size = os.path.getsize(store.path(first))
+    store.max_bytes = 2 * size + size // 2
+
+    second = store.record('search:b', frame(2000, 1), 'v1')
+    store.load(first)  # now more recently used than the second
+    third = store.record('upload:c', frame(2000, 2), 'v2')
+
+    assert not os.path.exists(store.path(second))
+    assert store.list('search:b').empty
+    assert os.path.exists(store.path(first)) and os.path.exists(store.path(third))
+
+
+def test_index_without_sizes_is_upgraded(tmp_path):
+    store = SnapshotStore(root=str(tmp_path))
+    snapshot_id = store.record('search:a', frame(100, 0), 'v0')
+    store._conn.execute("UPDATE snapshots SET size_bytes = 0")
+    store._conn.commit()
+
+    reopened = SnapshotStore(root=str(tmp_path))
+    size = reopened._conn.execute("SELECT size_bytes FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()[0]
+    assert size == os.path.getsize(reopened.path(snapshot_id))
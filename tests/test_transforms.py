@@ -0,0 +1,33 @@
+import io
+
+import pandas as pd
+
+from ingest import ingest
+from records import to_records
+from transforms import apply_mapping, mapping_spec, parse_dates
+
+DATES = ['01/15/2026', '02/28/2026', '12/01/2025', None]
+
+
+def test_parse_dates_categorical_non_iso():
+    series = pd.Series(DATES * 20, dtype='category')
+    parsed = parse_dates(series)
+    assert pd.api.types.is_datetime64_any_dtype(parsed)
+    assert parsed.index.equals(series.index)
+    assert parsed.iloc[:4].tolist()[:3] == [pd.Timestamp('2026-01-15'), pd.Timestamp('2026-02-28'),
+                                            pd.Timestamp('2025-12-01')]
+    assert parsed.isna().sum() == 20
+
+
+def test_compacted_upload_dates_map_to_datetimes():
+    # Low-cardinality date columns come out of ingest as categoricals
+    csv = pd.DataFrame({
+        'Title': [f"Requirement {i}" for i in range(80)],
+        'Release': DATES[:3] * 26 + DATES[:2],
+    }).to_csv(index=False).encode()
+    df, _ = ingest(io.BytesIO(csv), 'csv')
+    assert isinstance(df['Release'].dtype, pd.CategoricalDtype)
+
+    records, _, _ = to_records(apply_mapping(df, mapping_spec({'title': 'Title', 'postedDate': 'Release'})))
+    assert pd.api.types.is_datetime64_any_dtype(records['postedDate'])
+    assert records['postedDate'].iloc[0] == pd.Timestamp('2026-01-15')
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+LANE_COLUMNS = {
+    'Agency': 'fullParentPathName',
+    'NAICS': 'naicsCode',
+}
+BUCKETS = {
+    'Day': 'D',
+    'Week': 'W',
+    'Month': 'M',
+}
+MAX_LANES = 25
+DEFAULT_MAX_BARS = 500
+WEBGL_THRESHOLD = 200  # above this many bars, draw segments with Scattergl
+
+
+def timeline_rows(df):
+    if 'postedDate' not in df.columns or 'responseDeadLine' not in df.columns:
+        return df.iloc[0:0]
+    return df.dropna(subset=['postedDate', 'responseDeadLine'])
+
+
+def lane_labels(rows, lane_column, max_lanes=MAX_LANES):
+    # Lane of each row; lanes outside the max_lanes largest are pooled as 'Other'
+    lanes = rows[lane_column].astype(str) if lane_column in rows.columns else pd.Series('All', index=rows.index)
+    top = lanes.value_counts().index[:max_lanes]
+    return lanes.where(lanes.isin(top), 'Other')
+
+
+def lane_density(df, lane_column, freq='W', max_lanes=MAX_LANES):
+    # Count opportunities open in each (lane, bucket). Each row adds +1 at the
+    # bucket it was posted in and -1 after the bucket of its deadline; a
+    # cumulative sum per lane then gives the open count without expanding rows
+    rows = timeline_rows(df)
+    if rows.empty:
+        return pd.DataFrame(columns=['lane', 'bucket', 'open'])
+
+    lanes = lane_labels(rows, lane_column, max_lanes)
+
+    start = rows['postedDate'].dt.to_period(freq)
+    end = rows['responseDeadLine'].dt.to_period(freq)
+    end = end.where(end >= start, start)
+
+    events = pd.concat([
+        pd.DataFrame({'lane': lanes.values, 'bucket': start.values, 'delta': 1}),
+        pd.DataFrame({'lane': lanes.values, 'bucket': (end + 1).values, 'delta': -1}),
+    ], ignore_index=True)
+    deltas = events.groupby(['lane', 'bucket'])['delta'].sum().unstack('lane', fill_value=0)
+
+    buckets = pd.period_range(deltas.index.min(), deltas.index.max(), freq=freq)
+    open_counts = deltas.reindex(buckets, fill_value=0).cumsum()
+    open_counts = open_counts.iloc[:-1]  # the last bucket only holds closing events
+
+    density = open_counts.stack().rename('open').reset_index()
+    density.columns = ['bucket', 'lane', 'open']
+    density['bucket'] = density['bucket'].dt.start_time
+    return density[density['open'] > 0].reset_index(drop=True)
+
+
+def density_figure(density, lane_label):
+    if density.empty:
+        return go.Figure()
+    grid = density.pivot(index='lane', columns='bucket', values='open').fillna(0)
+    grid = grid.loc[grid.sum(axis=1).sort_values().index]
+    fig = go.Figure(go.Heatmap(
+        z=grid.values,
+        x=grid.columns,
+        y=grid.index,
+        colorscale='Blues',
+        colorbar={'title': 'Open'},
+        hovertemplate='%{y}<br>%{x|%Y-%m-%d}: %{z} open<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Open Opportunities by {lane_label}",
+        height=max(300, 24 * len(grid.index) + 120)
+    )
+    return fig
+
+
+def drilldown_figure(df, lane_column, lane_value, max_bars=DEFAULT_MAX_BARS, webgl=True, max_lanes=MAX_LANES):
+    # Row-level bars for a single lane of lane_density, capped at the max_bars
+    # soonest deadlines. Returns (figure, rows_in_lane)
+    rows = timeline_rows(df)
+    rows = rows[(lane_labels(rows, lane_column, max_lanes) == lane_value).to_numpy()]
+    in_lane = len(rows)
+    rows = rows.nsmallest(max_bars, 'responseDeadLine')
+    title = f"{lane_value}: {len(rows)} of {in_lane} opportunities"
+
+    if not webgl or len(rows) <= WEBGL_THRESHOLD:
+        fig = px.timeline(
+            rows,
+            x_start='postedDate',
+            x_end='responseDeadLine',
+            y='title',
+            title=title
+        )
+        return fig, in_lane
+
+    # One Scattergl trace of [start, end, gap] segments instead of one bar per row
+    labels = rows['title'].astype(str).to_numpy()
+    n = len(rows)
+    x = np.empty(n * 3, dtype=object)
+    y = np.empty(n * 3, dtype=object)
+    x[0::3] = rows['postedDate'].to_numpy()
+    x[1::3] = rows['responseDeadLine'].to_numpy()
+    x[2::3] = None
+    y[0::3] = labels
+    y[1::3] = labels
+    y[2::3] = None
+    fig = go.Figure(go.Scattergl(x=x, y=y, mode='lines', line={'width': 6}, hoverinfo='y'))
+    fig.update_layout(title=title, height=max(400, min(8 * n, 4000)))
+    fig.update_yaxes(showticklabels=n <= WEBGL_THRESHOLD * 2)
+    return fig, in_lane
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+DATE_COLUMNS = ['postedDate', 'responseDeadLine']
+
+PANDAS_2 = int(pd.__version__.split('.')[0]) >= 2
+
+
+def utc_now():
+    return pd.Timestamp.now(tz='UTC').tz_convert(None)
+
+
+def parse_dates(series):
+    # Returns tz-naive UTC datetimes; anything unparseable becomes NaT
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if getattr(series.dt, 'tz', None) is not None:
+            return series.dt.tz_convert('UTC').dt.tz_localize(None)
+        return series
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Compacted uploads: parse each distinct value once, then map the
+        # results back through the codes (-1, a missing value, picks the NaT)
+        parsed = parse_dates(pd.Series(series.cat.categories.astype(str)))
+        values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns').astype(parsed.dtype))
+        return pd.Series(values[series.cat.codes.to_numpy()], index=series.index, name=series.name)
+
+    if PANDAS_2:
+        # Fast path: SAM.gov sends ISO 8601, sometimes with mixed UTC offsets
+        parsed = pd.to_datetime(series, errors='coerce', utc=True, format='ISO8601')
+        leftover = parsed.isna() & series.notna()
+        if leftover.any():
+            parsed[leftover] = pd.to_datetime(series[leftover], errors='coerce', utc=True, format='mixed')
+    else:
+        parsed = pd.to_datetime(series, errors='coerce', utc=True)
+    return parsed.dt.tz_convert('UTC').dt.tz_localize(None)
+
+
+def normalize_dates(df, now=None):
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_dates(df[column])
+
+    if 'responseDeadLine' in df.columns:
+        now = utc_now() if now is None else now
+        df['days_remaining'] = (df['responseDeadLine'] - now).dt.days.clip(lower=0)
+    return df
+
+
+STANDARD_FIELDS = {
+    'title': 'Opportunity Title',
+    'type': 'Opportunity Type',
+    'postedDate': 'Posted Date',
+    'responseDeadLine': 'Response Deadline',
+    'naicsCode': 'NAICS',
+    'fullParentPathName': 'Component',
+    'placeOfPerformance': 'Place of Performance'
+}
+
+# Added by batch uploads to record where each row came from; carried through mapping
+PROVENANCE_COLUMNS = ['source_file', 'source_sheet']
+
+# Used when a standard field is left unmapped: (APFS column to fall back on, constant)
+FIELD_FALLBACKS = {
+    'title': ('APFS Number', 'N/A'),
+    'type': (None, 'N/A'),
+    'postedDate': (None, None),  # today, filled in at apply time
+    'responseDeadLine': (None, 'N/A'),
+    'naicsCode': ('NAICS', 'N/A'),
+    'fullParentPathName': ('Component', 'N/A'),
+    'placeOfPerformance': (None, 'N/A')
+}
+
+MAPPING_SPECS_FILE = 'mapping_specs.json'
+
+
+def mapping_spec(mapping):
+    # Hashable, order-independent form of {standard field: source column or None},
+    # kept in STANDARD_FIELDS order so mapped columns come out in that order
+    order = {field: i for i, field in enumerate(STANDARD_FIELDS)}
+    return tuple(sorted(
+        ((field, None if source in (None, 'None') else source)
+         for field, source in mapping.items()),
+        key=lambda item: (order.get(item[0], len(order)), item[0])
+    ))
+
+
+def spec_columns(spec, available):
+    # Source columns a spec reads, including fallbacks that exist in the file
+    columns = [source for _, source in spec if source is not None]
+    for field, source in spec:
+        fallback = FIELD_FALLBACKS.get(field, (None, None))[0]
+        if source is None and fallback in available and fallback not in columns:
+            columns.append(fallback)
+    columns.extend(c for c in PROVENANCE_COLUMNS if c in available and c not in columns)
+    return columns
+
+
+def filled_fields(spec, available):
+    # Standard fields apply_mapping fills with a constant or today's date,
+    # because neither they nor their fallback column are in the file
+    return [field for field, source in spec
+            if source is None and FIELD_FALLBACKS.get(field, (None, None))[0] not in available]
+
+
+def apply_mapping(df, spec):
+    # One projection: every output column is built first, then the frame once
+    columns = {}
+    for field, source in spec:
+        fallback_column, constant = FIELD_FALLBACKS.get(field, (None, 'N/A'))
+        if source is not None:
+            columns[field] = df[source]
+        elif fallback_column is not None and fallback_column in df.columns:
+            columns[field] = df[fallback_column].astype(str)
+        elif field == 'postedDate':
+            columns[field] = pd.Timestamp.now().strftime('%Y-%m-%d')
+        else:
+            columns[field] = constant
+    columns['uiLink'] = '#'
+    for column in PROVENANCE_COLUMNS:
+        if column in df.columns:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, index=df.index)
+
+
+def schema_fingerprint(columns):
+    return hashlib.sha1(json.dumps(sorted(map(str, columns))).encode()).hexdigest()
+
+
+def load_saved_mapping(columns, path=MAPPING_SPECS_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        saved = json.load(f)
+    spec = saved.get(schema_fingerprint(columns))
+    return dict(spec) if spec is not None else None
+
+
+def save_mapping(columns, spec, path=MAPPING_SPECS_FILE):
+    saved = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+    saved[schema_fingerprint(columns)] = [list(item) for item in spec]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(saved, f, indent=2)
+    os.replace(tmp_path, path)
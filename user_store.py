@@ -0,0 +1,184 @@
+import json
+import os
+import pickle
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from passwords import hash_password, is_hashed
+
+USERS_DB_FILE = 'users.db'
+LEGACY_PICKLE_FILE = 'users.pkl'
+POOL_SIZE = 4
+
+
+class ConnectionPool:
+    # A fixed set of SQLite connections handed out one caller at a time
+    def __init__(self, db_file, size=POOL_SIZE):
+        self._connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            conn = sqlite3.connect(db_file, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+
+class UserStore:
+    def __init__(self, db_file=USERS_DB_FILE, pool_size=POOL_SIZE):
+        self.db_file = db_file
+        self.pool = ConnectionPool(db_file, pool_size)
+        with self.pool.connection() as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            # username is indexed as the primary key
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS saved_filters (
+                    username TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    filters TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (username, name)
+                )
+            """)
+
+    def get(self, username):
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT username, password, email, created_at FROM users WHERE username = ?",
+                (username,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'username': row[0], 'password': row[1], 'email': row[2], 'created_at': row[3]}
+
+    def insert(self, username, password, email, created_at=None):
+        # Returns False if the username is taken; the primary key makes racing
+        # registrations safe without any read-then-write window
+        created_at = (created_at or datetime.now()).isoformat()
+        try:
+            with self.pool.connection() as conn, conn:
+                conn.execute(
+                    "INSERT INTO users (username, password, email, created_at) VALUES (?, ?, ?, ?)",
+                    (username, password, email, created_at)
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def upsert(self, username, password, email, created_at=None):
+        created_at = (created_at or datetime.now()).isoformat()
+        with self.pool.connection() as conn, conn:
+            conn.execute(
+                "INSERT INTO users (username, password, email, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET password = excluded.password, email = excluded.email",
+                (username, password, email, created_at)
+            )
+
+    def set_password(self, username, password, email=None):
+        # Only matches when email matches too, if one is given
+        query = "UPDATE users SET password = ? WHERE username = ?"
+        params = [password, username]
+        if email is not None:
+            query += " AND email = ?"
+            params.append(email)
+        with self.pool.connection() as conn, conn:
+            return conn.execute(query, params).rowcount == 1
+
+    def save_filter(self, username, name, filters):
+        with self.pool.connection() as conn, conn:
+            conn.execute(
+                "INSERT INTO saved_filters (username, name, filters, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(username, name) DO UPDATE SET filters = excluded.filters, "
+                "updated_at = excluded.updated_at",
+                (username, name, json.dumps(filters), datetime.now().isoformat())
+            )
+
+    def delete_filter(self, username, name):
+        with self.pool.connection() as conn, conn:
+            conn.execute("DELETE FROM saved_filters WHERE username = ? AND name = ?", (username, name))
+
+    def list_filters(self, username):
+        # {name: filters} for one user
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT name, filters FROM saved_filters WHERE username = ? ORDER BY name", (username,)
+            ).fetchall()
+        return {name: json.loads(filters) for name, filters in rows}
+
+    def all_filters(self):
+        # [(username, name, filters)] across every user, for the sync worker
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT username, name, filters FROM saved_filters").fetchall()
+        return [(username, name, json.loads(filters)) for username, name, filters in rows]
+
+    def count(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def migrate_pickle(self, path=LEGACY_PICKLE_FILE):
+        # One-time import of the old users.pkl; the file is renamed afterwards so
+        # it is never read again. Existing rows win over the pickle. The pickle
+        # kept plaintext passwords, which are hashed on the way in
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            users = pickle.load(f)
+
+        rows = [
+            (username, info['password'] if is_hashed(info['password']) else hash_password(info['password']),
+             info.get('email', ''),
+             (info.get('created_at') or datetime.now()).isoformat())
+            for username, info in users.items()
+        ]
+        with self.pool.connection() as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (username, password, email, created_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        os.replace(path, f"{path}.migrated")
+        return len(rows)
+
+    def hash_plaintext_passwords(self):
+        # Rows migrated before passwords were hashed on import
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT username, password FROM users WHERE password NOT LIKE 'scrypt$%'").fetchall()
+        for username, password in rows:
+            self.set_password(username, hash_password(password))
+        return len(rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    # One store (and connection pool) per process, shared by every session and rerun
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = UserStore()
+            store.migrate_pickle()
+            store.hash_plaintext_passwords()
+            if store.count() == 0:
+                # Change this default password
+                store.insert('admin', hash_password('admin123'), 'admin@example.com')
+            _store = store
+        return _store
@@ -0,0 +1,78 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# sort_by label -> (column, ascending)
+SORT_KEYS = {
+    'Posted Date': ('postedDate', False),
+    'Response Deadline': ('responseDeadLine', True),
+    'Agency': ('fullParentPathName', True),
+}
+
+
+class DatasetView:
+    # Sort permutations and filter masks over one dataset version, each built
+    # on first use. Selections are arrays of row positions; the frame is only
+    # sliced for the rows actually displayed
+    def __init__(self, df):
+        self.df = df
+        self._orders = {}
+        self._masks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.df)
+
+    def order(self, sort_by=None):
+        with self._lock:
+            if sort_by not in self._orders:
+                column, ascending = SORT_KEYS.get(sort_by, (None, True))
+                if column in self.df.columns:
+                    values = self.df[column].reset_index(drop=True)
+                    perm = values.sort_values(ascending=ascending, na_position='last', kind='stable').index
+                    self._orders[sort_by] = perm.to_numpy(dtype=np.int64)
+                else:
+                    self._orders[sort_by] = np.arange(len(self.df), dtype=np.int64)
+            return self._orders[sort_by]
+
+    def mask(self, name, values=None):
+        # None when the dataset has nothing to filter on
+        key = (name, tuple(sorted(values)) if values else None)
+        with self._lock:
+            if key not in self._masks:
+                self._masks[key] = self._build_mask(name, values)
+            return self._masks[key]
+
+    def _build_mask(self, name, values):
+        df = self.df
+        if name == 'active':
+            if 'days_remaining' not in df.columns:
+                return None
+            return (df['days_remaining'] > 0).to_numpy()
+        if name == 'set_aside':
+            # values are SAM.gov typeOfSetAside codes
+            if 'typeOfSetAside' not in df.columns:
+                return None
+            return df['typeOfSetAside'].isin(list(values)).to_numpy()
+        raise ValueError(f"Unknown filter: {name}")
+
+    def select(self, sort_by=None, masks=(), rows=None):
+        # rows: optional positions to restrict to, e.g. keyword search hits.
+        # Everything is a boolean AND over n rows plus one gather through the
+        # cached permutation, so a sort or filter change never re-sorts
+        perm = self.order(sort_by)
+        selected = None
+        if rows is not None:
+            selected = np.zeros(len(self.df), dtype=bool)
+            selected[rows] = True
+        for mask in masks:
+            if mask is not None:
+                selected = mask.copy() if selected is None else selected & mask
+        if selected is None:
+            return perm
+        return perm[selected[perm]]
+
+    def rows(self, positions):
+        return self.df.iloc[positions]
+